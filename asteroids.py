@@ -1,24 +1,91 @@
 import pygame
+import argparse
+import os
 import sys
+import gc
+import itertools
 import math
 import random
+import time
+import numpy as np
 
-# Initialize Pygame
-pygame.init()
 screen_width = 800
 screen_height = 600
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Asteroids")
+screen = None  # created by init_display()
 clock = pygame.time.Clock()
 
+# Initialize Pygame and open the window. headless uses the SDL dummy video
+# driver so the game can run without a display (stress mode, CI).
+def init_display(headless=False):
+    global screen
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    pygame.init()
+    screen = pygame.display.set_mode((screen_width, screen_height))
+    pygame.display.set_caption("Asteroids")
+
 # Define Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 
+# Random source for asteroid headings and speeds
+rng = np.random.default_rng()
+
+# -----------------------------
+# Allocation and GC Counters
+# -----------------------------
+# Counts entity array allocations and garbage collector runs, and how long
+# the collector paused the game, so long sessions can be checked for stalls.
+class AllocationStats:
+    __slots__ = ('array_allocations', 'gc_collections', 'gc_pause_total',
+                 'gc_pause_max', 'gc_started')
+
+    def __init__(self):
+        self.reset()
+        gc.callbacks.append(self.on_gc)
+
+    def reset(self):
+        self.array_allocations = 0
+        self.gc_collections = 0
+        self.gc_pause_total = 0.0
+        self.gc_pause_max = 0.0
+        self.gc_started = 0.0
+
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.gc_started = time.perf_counter()
+            return
+        pause = time.perf_counter() - self.gc_started
+        self.gc_collections += 1
+        self.gc_pause_total += pause
+        self.gc_pause_max = max(self.gc_pause_max, pause)
+
+    def summary(self):
+        return ("entity array allocations: %d, GC runs: %d, GC pause total %.2f ms, max %.2f ms"
+                % (self.array_allocations, self.gc_collections,
+                   self.gc_pause_total * 1000, self.gc_pause_max * 1000))
+
+stats = AllocationStats()
+
+# -----------------------------
+# Trig Tables
+# -----------------------------
+# Direction vectors for every whole degree, built once. The ship turns in
+# 5 degree steps and asteroids pick whole-degree headings, so no trig runs
+# per frame. Scalar code reads the lists, bulk code the arrays.
+COS_TABLE = [math.cos(math.radians(angle)) for angle in range(360)]
+SIN_TABLE = [math.sin(math.radians(angle)) for angle in range(360)]
+COS_ARRAY = np.array(COS_TABLE)
+SIN_ARRAY = np.array(SIN_TABLE)
+
 # -----------------------------
 # Ship Class
 # -----------------------------
 class Ship:
+    __slots__ = ('x', 'y', 'angle', 'velocity', 'radius')
+    # Triangle vertex offsets from the ship centre, keyed by (angle, radius)
+    outlines = {}
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -33,83 +100,295 @@ class Ship:
         self.velocity[0] *= 0.99
         self.velocity[1] *= 0.99
         # Wrap around the screen edges
-        if self.x < 0:
-            self.x += screen_width
-        elif self.x > screen_width:
-            self.x -= screen_width
-        if self.y < 0:
-            self.y += screen_height
-        elif self.y > screen_height:
-            self.y -= screen_height
+        self.x %= screen_width
+        self.y %= screen_height
+
+    # Turn by a whole number of degrees, keeping the angle in [0, 360)
+    def rotate(self, degrees):
+        self.angle = (self.angle + degrees) % 360
+
+    # Unit vector the ship is facing (screen y grows downwards)
+    def direction(self):
+        return COS_TABLE[self.angle], -SIN_TABLE[self.angle]
+
+    # The ship's tip and its two rear vertices relative to its centre,
+    # computed once per angle
+    def outline(self):
+        key = (self.angle, self.radius)
+        if key not in Ship.outlines:
+            tip, left, right = self.angle, (self.angle + 130) % 360, (self.angle - 130) % 360
+            Ship.outlines[key] = ((COS_TABLE[tip] * self.radius * 2, -SIN_TABLE[tip] * self.radius * 2),
+                                  (COS_TABLE[left] * self.radius, -SIN_TABLE[left] * self.radius),
+                                  (COS_TABLE[right] * self.radius, -SIN_TABLE[right] * self.radius))
+        return Ship.outlines[key]
 
     def draw(self, surface):
-        # Calculate the ship's tip and its two rear vertices for a triangle shape
-        tip_x = self.x + math.cos(math.radians(self.angle)) * self.radius * 2
-        tip_y = self.y - math.sin(math.radians(self.angle)) * self.radius * 2
-        left_x = self.x + math.cos(math.radians(self.angle + 130)) * self.radius
-        left_y = self.y - math.sin(math.radians(self.angle + 130)) * self.radius
-        right_x = self.x + math.cos(math.radians(self.angle - 130)) * self.radius
-        right_y = self.y - math.sin(math.radians(self.angle - 130)) * self.radius
-        pygame.draw.polygon(surface, WHITE, [(tip_x, tip_y), (left_x, left_y), (right_x, right_y)], 1)
+        # Offset the cached triangle to the ship's position
+        (tip_x, tip_y), (left_x, left_y), (right_x, right_y) = self.outline()
+        pygame.draw.polygon(surface, WHITE, [(self.x + tip_x, self.y + tip_y),
+                                             (self.x + left_x, self.y + left_y),
+                                             (self.x + right_x, self.y + right_y)], 1)
 
 # -----------------------------
-# Bullet Class
+# Entity Arrays
 # -----------------------------
-class Bullet:
-    def __init__(self, x, y, angle):
-        self.x = x
-        self.y = y
-        speed = 10
-        self.vx = math.cos(math.radians(angle)) * speed
-        self.vy = -math.sin(math.radians(angle)) * speed
-        self.life = 60  # Bullet exists for 60 frames
+# Bullets and asteroids are stored as a structure of arrays: one NumPy array
+# per field, so movement, wrapping, expiry and splitting run as bulk
+# operations instead of one Python object at a time.
+#
+# Each store is a pool: the arrays are allocated once with spare capacity,
+# live entities are packed at the front and the free slots are the tail.
+# Spawning fills free slots, and removing an entity moves a live one from
+# the end into its slot, so entities are recycled rather than allocated.
+# The arrays are only reallocated (doubling) when a pool runs out of room.
+# The field attributes (x, y, ...) are views of the live part.
+class EntityArrays:
+    __slots__ = ('count', 'buffers')
+    fields = ()  # (name, dtype) pairs
 
-    def update(self):
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.buffers = {}
+        self.allocate(capacity)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def capacity(self):
+        return len(self.buffers[self.fields[0][0]])
+
+    # (Re)allocate every field with room for capacity entities.
+    def allocate(self, capacity):
+        for name, dtype in self.fields:
+            buffer = np.zeros(capacity, dtype=dtype)
+            if name in self.buffers:
+                buffer[:self.count] = self.buffers[name][:self.count]
+            self.buffers[name] = buffer
+        stats.array_allocations += 1
+        self.refresh_views()
+
+    def refresh_views(self):
+        for name, dtype in self.fields:
+            setattr(self, name, self.buffers[name][:self.count])
+
+    # Add entities in free slots; scalar values are broadcast to the longest
+    # field.
+    def append(self, **values):
+        added = max(np.size(value) for value in values.values())
+        start = self.count
+        if start + added > self.capacity:
+            self.allocate(max(2 * self.capacity, start + added))
+        for name, dtype in self.fields:
+            self.buffers[name][start:start + added] = values[name]
+        self.count = start + added
+        self.refresh_views()
+
+    # Remove the entities at the given indices by moving live entities from
+    # the end of the pool into their slots. Costs O(removed entities).
+    def remove(self, indices):
+        indices = np.unique(indices)
+        count = self.count - len(indices)
+        holes = indices[indices < count]
+        tail = np.arange(count, self.count)
+        movers = tail[~np.isin(tail, indices)]
+        for buffer in self.buffers.values():
+            buffer[holes] = buffer[movers]
+        self.count = count
+        self.refresh_views()
+
+    # Integrate positions and wrap around the screen edges.
+    def move(self):
         self.x += self.vx
         self.y += self.vy
-        self.life -= 1
-        # Wrap around the screen edges
-        if self.x < 0:
-            self.x += screen_width
-        elif self.x > screen_width:
-            self.x -= screen_width
-        if self.y < 0:
-            self.y += screen_height
-        elif self.y > screen_height:
-            self.y -= screen_height
+        np.mod(self.x, screen_width, out=self.x)
+        np.mod(self.y, screen_height, out=self.y)
 
-    def draw(self, surface):
-        pygame.draw.circle(surface, WHITE, (int(self.x), int(self.y)), 2)
+# -----------------------------
+# Bullets
+# -----------------------------
+class Bullets(EntityArrays):
+    fields = (('x', float), ('y', float), ('vx', float), ('vy', float), ('life', int))
+    __slots__ = tuple(name for name, dtype in fields)
+
+    def fire(self, x, y, angle):
+        speed = 10
+        self.append(x=x, y=y,
+                    vx=COS_TABLE[angle % 360] * speed,
+                    vy=-SIN_TABLE[angle % 360] * speed,
+                    life=60)  # Bullet exists for 60 frames
+
+    def update(self):
+        self.move()
+        self.life -= 1
+        expired = np.flatnonzero(self.life <= 0)
+        if len(expired):
+            self.remove(expired)
 
 # -----------------------------
-# Asteroid Class
+# Asteroids
 # -----------------------------
-class Asteroid:
-    def __init__(self, x, y, size):
-        self.x = x
-        self.y = y
-        self.size = size  # 3 = large, 2 = medium, 1 = small
-        angle = random.uniform(0, 360)
-        speed = random.uniform(1, 3)
-        self.vx = math.cos(math.radians(angle)) * speed
-        self.vy = -math.sin(math.radians(angle)) * speed
-        self.radius = size * 15  # Adjust radius based on size
+class Asteroids(EntityArrays):
+    fields = (('x', float), ('y', float), ('vx', float), ('vy', float),
+              ('size', int), ('radius', int))
+    __slots__ = tuple(name for name, dtype in fields)
+
+    # Add asteroids at the given positions with random headings and speeds.
+    # size: 3 = large, 2 = medium, 1 = small
+    def spawn(self, x, y, size):
+        count = max(np.size(x), np.size(y), np.size(size))
+        angle = rng.integers(0, 360, count)
+        speed = rng.uniform(1, 3, count)
+        self.append(x=x, y=y, vx=COS_ARRAY[angle] * speed, vy=-SIN_ARRAY[angle] * speed,
+                    size=size, radius=np.asarray(size) * 15)  # Radius based on size
 
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        # Wrap around the screen edges
-        if self.x < 0:
-            self.x += screen_width
-        elif self.x > screen_width:
-            self.x -= screen_width
-        if self.y < 0:
-            self.y += screen_height
-        elif self.y > screen_height:
-            self.y -= screen_height
+        self.move()
 
-    def draw(self, surface):
-        pygame.draw.circle(surface, WHITE, (int(self.x), int(self.y)), self.radius, 1)
+    # Remove the asteroids at the given indices, splitting every one that is
+    # not the smallest into two smaller ones.
+    def split(self, indices):
+        parents = indices[self.size[indices] > 1]
+        x = np.repeat(self.x[parents], 2)
+        y = np.repeat(self.y[parents], 2)
+        size = np.repeat(self.size[parents] - 1, 2)
+        self.remove(indices)
+        if len(parents):
+            self.spawn(x, y, size)
+
+# -----------------------------
+# Spatial Hash (collision broad-phase)
+# -----------------------------
+# Largest asteroid radius plus the ship radius: any pair that can collide is
+# at most one cell apart, so a query only has to look at a 3x3 block.
+HASH_CELL_SIZE = 3 * 15 + 15
+
+# Uniform grid over the screen that buckets objects by position. Cell
+# coordinates wrap around like the screen does, so objects sitting on an
+# edge land in a valid bucket and neighbourhoods continue across it.
+# Buckets are stored as one index array sorted by cell, so building and
+# querying are bulk NumPy operations.
+class SpatialHash:
+    def __init__(self, width, height, cell_size=HASH_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cols = math.ceil(width / cell_size)
+        self.rows = math.ceil(height / cell_size)
+        self.order = np.zeros(0, dtype=int)
+        self.starts = np.zeros(self.cols * self.rows, dtype=int)
+        self.counts = np.zeros(self.cols * self.rows, dtype=int)
+
+    def cells(self, x, y):
+        col = (x // self.cell_size).astype(int)
+        row = (y // self.cell_size).astype(int)
+        return col, row
+
+    # Bucket the objects at (x, y) by cell, remembering their indices.
+    def rebuild(self, x, y):
+        col, row = self.cells(x, y)
+        keys = (row % self.rows) * self.cols + col % self.cols
+        self.order = np.argsort(keys, kind='stable')
+        self.counts = np.bincount(keys, minlength=self.cols * self.rows)
+        self.starts = np.cumsum(self.counts) - self.counts
+
+    # Every (query, object) index pair where the object lies in the 3x3
+    # block of cells around query point (x, y).
+    def candidate_pairs(self, x, y):
+        col, row = self.cells(np.atleast_1d(x), np.atleast_1d(y))
+        queries = np.arange(len(col))
+        keys = [((row + dr) % self.rows) * self.cols + (col + dc) % self.cols
+                for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+        keys = np.concatenate(keys)
+        counts = self.counts[keys]
+        total = counts.sum()
+        first = np.cumsum(counts) - counts
+        offsets = np.arange(total) - np.repeat(first, counts)
+        objects = self.order[np.repeat(self.starts[keys], counts) + offsets]
+        return np.repeat(np.tile(queries, 9), counts), objects
+
+# -----------------------------
+# Sprite Cache
+# -----------------------------
+# Pre-renders every asteroid size, the bullet and each ship rotation to
+# surfaces once, so a frame is drawn with a single batched blit call instead
+# of rasterizing every circle and polygon again. The blit items are
+# [sprite, [x, y]] lists kept from frame to frame and updated in place, so
+# drawing allocates no tuples per entity for the garbage collector to chase.
+class SpriteCache:
+    __slots__ = ('asteroids', 'asteroid_offsets', 'bullet', 'bullet_offset',
+                 'ships', 'ship_offset', 'ship_item', 'bullet_items', 'asteroid_items')
+
+    def __init__(self, ship_radius=10):
+        # Asteroid sprites indexed by size (3 = large, 2 = medium, 1 = small)
+        self.asteroids = [None]
+        self.asteroid_offsets = np.zeros(4, dtype=int)
+        for size in (1, 2, 3):
+            radius = size * 15
+            self.asteroids.append(self.circle_sprite(radius, 1))
+            self.asteroid_offsets[size] = radius + 1
+        self.bullet = self.circle_sprite(2, 0)
+        self.bullet_offset = 3
+        # Ship sprites for every angle it can face, centred on the sprite
+        self.ship_offset = ship_radius * 2 + 2
+        self.ships = {}
+        for angle in range(0, 360, 5):
+            ship = Ship(self.ship_offset, self.ship_offset)
+            ship.radius = ship_radius
+            ship.rotate(angle)
+            sprite = self.blank(2 * self.ship_offset + 1)
+            ship.draw(sprite)
+            self.ships[angle] = sprite
+        self.ship_item = [None, [0, 0]]
+        self.bullet_items = []
+        self.asteroid_items = []
+
+    @staticmethod
+    def blank(size):
+        sprite = pygame.Surface((size, size)).convert()
+        sprite.fill(BLACK)
+        sprite.set_colorkey(BLACK, pygame.RLEACCEL)
+        return sprite
+
+    def circle_sprite(self, radius, width):
+        sprite = self.blank(2 * radius + 2)
+        pygame.draw.circle(sprite, WHITE, (radius + 1, radius + 1), radius, width)
+        return sprite
+
+    # Fill the first len(xs) of a pool's blit items, adding items as the
+    # pool grows, and return them
+    @staticmethod
+    def place(items, xs, ys, sprites):
+        while len(items) < len(xs):
+            items.append([None, [0, 0]])
+        for item, x, y, sprite in zip(items, xs, ys, sprites):
+            item[0] = sprite
+            position = item[1]
+            position[0] = x
+            position[1] = y
+        return items[:len(xs)]
+
+    # Blit sequence for the whole scene; its items are reused by the next call
+    def batch(self, ship, bullets, asteroids):
+        ship_item = self.ship_item
+        ship_item[0] = self.ships[ship.angle]
+        ship_item[1][0] = int(ship.x) - self.ship_offset
+        ship_item[1][1] = int(ship.y) - self.ship_offset
+        bullet_items = self.place(self.bullet_items,
+                                  (bullets.x.astype(int) - self.bullet_offset).tolist(),
+                                  (bullets.y.astype(int) - self.bullet_offset).tolist(),
+                                  itertools.repeat(self.bullet))
+        offsets = self.asteroid_offsets[asteroids.size]
+        asteroid_items = self.place(self.asteroid_items,
+                                    (asteroids.x.astype(int) - offsets).tolist(),
+                                    (asteroids.y.astype(int) - offsets).tolist(),
+                                    map(self.asteroids.__getitem__, asteroids.size.tolist()))
+        return [ship_item] + bullet_items + asteroid_items
+
+    def draw(self, surface, ship, bullets, asteroids):
+        sequence = self.batch(ship, bullets, asteroids)
+        if hasattr(surface, "fblits"):
+            surface.fblits(sequence)
+        else:
+            surface.blits(sequence, doreturn=False)
 
 # -----------------------------
 # Instruction Screen
@@ -168,14 +447,45 @@ def game_over_screen():
                     return False  # Quit the game
         clock.tick(60)
 
+# -----------------------------
+# Collisions
+# -----------------------------
+# Check for bullet-asteroid collisions. Only asteroids in the cells around
+# each bullet are tested. Each bullet hits the first asteroid it overlaps and
+# each asteroid is destroyed by the first bullet that hits it; removals and
+# splits are applied in one pass afterwards. Leaves the grid up to date.
+def resolve_collisions(grid, bullets, asteroids):
+    grid.rebuild(asteroids.x, asteroids.y)
+    b, a = grid.candidate_pairs(bullets.x, bullets.y)
+    hit = np.hypot(bullets.x[b] - asteroids.x[a], bullets.y[b] - asteroids.y[a]) < asteroids.radius[a]
+    if hit.any():
+        b, a = b[hit], a[hit]
+        order = np.lexsort((a, b))
+        b, a = b[order], a[order]
+        first = np.unique(b, return_index=True)[1]
+        b, a = b[first], a[first]
+        first = np.unique(a, return_index=True)[1]
+        b, a = b[first], a[first]
+        bullets.remove(b)
+        asteroids.split(a)
+        grid.rebuild(asteroids.x, asteroids.y)
+
+# Check for collisions between the ship and nearby asteroids.
+def ship_hit(grid, ship, asteroids):
+    _, a = grid.candidate_pairs(ship.x, ship.y)
+    dist = np.hypot(ship.x - asteroids.x[a], ship.y - asteroids.y[a])
+    return bool((dist < asteroids.radius[a] + ship.radius).any())
+
 # -----------------------------
 # Main Game Loop
 # -----------------------------
 def main():
     # Initialize game objects
     ship = Ship(screen_width / 2, screen_height / 2)
-    bullets = []
-    asteroids = []
+    bullets = Bullets(capacity=256)
+    asteroids = Asteroids(capacity=256)
+    grid = SpatialHash(screen_width, screen_height)
+    sprites = SpriteCache(ship.radius)
 
     # Create initial asteroids coming from the screen edges
     for i in range(5):
@@ -192,7 +502,7 @@ def main():
         else:  # right
             x = screen_width
             y = random.randint(0, screen_height)
-        asteroids.append(Asteroid(x, y, 3))
+        asteroids.spawn(x, y, 3)
 
     game_over = False
 
@@ -203,59 +513,34 @@ def main():
             # Fire a bullet when space is pressed
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    bullet_x = ship.x + math.cos(math.radians(ship.angle)) * ship.radius * 2
-                    bullet_y = ship.y - math.sin(math.radians(ship.angle)) * ship.radius * 2
-                    bullets.append(Bullet(bullet_x, bullet_y, ship.angle))
+                    # Bullets leave from the ship's tip
+                    tip_x, tip_y = ship.outline()[0]
+                    bullets.fire(ship.x + tip_x, ship.y + tip_y, ship.angle)
 
         # Handle continuous key presses for rotation and thrust
         keys = pygame.key.get_pressed()
         if keys[pygame.K_LEFT]:
-            ship.angle += 5
+            ship.rotate(5)
         if keys[pygame.K_RIGHT]:
-            ship.angle -= 5
+            ship.rotate(-5)
         if keys[pygame.K_UP]:
             thrust = 0.2
-            ship.velocity[0] += math.cos(math.radians(ship.angle)) * thrust
-            ship.velocity[1] -= math.sin(math.radians(ship.angle)) * thrust
+            dx, dy = ship.direction()
+            ship.velocity[0] += dx * thrust
+            ship.velocity[1] += dy * thrust
 
         # Update game objects
         ship.update()
-        for bullet in bullets[:]:
-            bullet.update()
-            if bullet.life <= 0:
-                bullets.remove(bullet)
-        for asteroid in asteroids:
-            asteroid.update()
-
-        # Check for bullet-asteroid collisions
-        for bullet in bullets[:]:
-            for asteroid in asteroids[:]:
-                dist = math.hypot(bullet.x - asteroid.x, bullet.y - asteroid.y)
-                if dist < asteroid.radius:
-                    if bullet in bullets:
-                        bullets.remove(bullet)
-                    if asteroid in asteroids:
-                        asteroids.remove(asteroid)
-                    # If the asteroid is not the smallest, split it into two smaller ones
-                    if asteroid.size > 1:
-                        for _ in range(2):
-                            asteroids.append(Asteroid(asteroid.x, asteroid.y, asteroid.size - 1))
-                    break
-
-        # Check for collisions between the ship and asteroids
-        for asteroid in asteroids:
-            dist = math.hypot(ship.x - asteroid.x, ship.y - asteroid.y)
-            if dist < asteroid.radius + ship.radius:
-                game_over = True
-                break
+        bullets.update()
+        asteroids.update()
+
+        resolve_collisions(grid, bullets, asteroids)
+        if ship_hit(grid, ship, asteroids):
+            game_over = True
 
         # Draw everything on the screen
         screen.fill(BLACK)
-        ship.draw(screen)
-        for bullet in bullets:
-            bullet.draw(screen)
-        for asteroid in asteroids:
-            asteroid.draw(screen)
+        sprites.draw(screen, ship, bullets, asteroids)
 
         pygame.display.update()
         clock.tick(60)
@@ -263,10 +548,97 @@ def main():
     # Show game over screen and ask to restart or quit
     return game_over_screen()
 
+# -----------------------------
+# Stress / Benchmark Mode
+# -----------------------------
+# Run a fixed number of frames with the given numbers of asteroids and bullets
+# and no frame cap. Destroyed asteroids and expired bullets are replaced every
+# frame so the load stays constant; the ship cannot die. Returns the per-frame
+# timings of each phase in seconds.
+def stress(num_asteroids, num_bullets, frames):
+    ship = Ship(screen_width / 2, screen_height / 2)
+    bullets = Bullets(capacity=max(num_bullets, 1))
+    asteroids = Asteroids(capacity=max(num_asteroids, 1))
+    grid = SpatialHash(screen_width, screen_height)
+    sprites = SpriteCache(ship.radius)
+    timings = {"update": [], "collision": [], "draw": []}
+
+    for frame in range(frames):
+        pygame.event.pump()
+        start = time.perf_counter()
+        missing = num_asteroids - len(asteroids)
+        if missing > 0:
+            asteroids.spawn(rng.uniform(0, screen_width, missing),
+                            rng.uniform(0, screen_height, missing),
+                            rng.integers(1, 4, missing))
+        missing = num_bullets - len(bullets)
+        if missing > 0:
+            angle = rng.integers(0, 360, missing)
+            bullets.append(x=rng.uniform(0, screen_width, missing),
+                           y=rng.uniform(0, screen_height, missing),
+                           vx=COS_ARRAY[angle] * 10, vy=-SIN_ARRAY[angle] * 10,
+                           life=rng.integers(1, 61, missing))
+        ship.rotate(5)
+        ship.update()
+        bullets.update()
+        asteroids.update()
+        collided = time.perf_counter()
+        timings["update"].append(collided - start)
+
+        resolve_collisions(grid, bullets, asteroids)
+        ship_hit(grid, ship, asteroids)
+        drawn = time.perf_counter()
+        timings["collision"].append(drawn - collided)
+
+        screen.fill(BLACK)
+        sprites.draw(screen, ship, bullets, asteroids)
+        pygame.display.update()
+        timings["draw"].append(time.perf_counter() - drawn)
+
+    timings["total"] = [sum(phase) for phase in zip(*timings.values())]
+    return timings
+
+# Format per-phase timing percentiles in milliseconds.
+def timing_report(timings):
+    lines = ["%-10s %8s %8s %8s %8s" % ("phase (ms)", "p50", "p90", "p99", "max")]
+    for phase, samples in timings.items():
+        p50, p90, p99, worst = np.percentile(samples, [50, 90, 99, 100]) * 1000
+        lines.append("%-10s %8.3f %8.3f %8.3f %8.3f" % (phase, p50, p90, p99, worst))
+    return "\n".join(lines)
+
 # -----------------------------
 # Run the Game with Restart Option
 # -----------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asteroids")
+    parser.add_argument("--stress", action="store_true",
+                        help="run a headless benchmark instead of the game")
+    parser.add_argument("--asteroids", type=int, default=1000,
+                        help="asteroids kept alive in stress mode")
+    parser.add_argument("--bullets", type=int, default=1000,
+                        help="bullets kept alive in stress mode")
+    parser.add_argument("--frames", type=int, default=600,
+                        help="frames to run in stress mode")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed (stress mode defaults to 0)")
+    args = parser.parse_args()
+    if args.asteroids < 0 or args.bullets < 0 or args.frames < 1:
+        parser.error("counts must not be negative and --frames must be at least 1")
+
+    seed = 0 if args.stress and args.seed is None else args.seed
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    init_display(headless=args.stress)
+
+    if args.stress:
+        timings = stress(args.asteroids, args.bullets, args.frames)
+        print("asteroids=%d bullets=%d frames=%d seed=%d"
+              % (args.asteroids, args.bullets, args.frames, seed))
+        print(timing_report(timings))
+        print(stats.summary())
+        pygame.quit()
+        sys.exit()
+
     show_instructions()
     while True:
         restart = main()
@@ -0,0 +1,450 @@
+import argparse
+import asyncio
+import random
+import struct
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pygame
+
+import asteroids as game
+from asteroids import (Ship, Bullets, Asteroids, SpatialHash, SpriteCache,
+                       resolve_collisions, screen_width, screen_height, BLACK)
+
+# Authoritative multi-ship Asteroids over localhost TCP.
+#
+#   python asteroids_server.py serve [--port 5555] [--tick-rate 60]
+#   python asteroids_server.py client [--port 5555]
+#   python asteroids_server.py bots --count 300 [--duration 30]
+#
+# The server owns the simulation and steps it at a fixed tick. Clients only
+# send their key state and draw the snapshots the server broadcasts after
+# every tick. The bots command is a load generator: it connects hundreds of
+# clients that press random keys and reports how many snapshots reached them,
+# while the server prints its tick timings, so the number of ships one process
+# can serve is where the server's step time reaches the tick budget.
+
+HOST = "127.0.0.1"
+PORT = 5555
+
+# -----------------------------
+# Protocol
+# -----------------------------
+# Client -> server: one byte per message holding the pressed keys; the server
+# keeps the latest byte per ship.
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_THRUST = 4
+INPUT_FIRE = 8
+
+# Server -> client: frames of a little-endian uint32 payload length followed
+# by the payload. The first frame is WELCOME with the client's ship id, every
+# later one a snapshot:
+#
+#   header   kind, tick, changed ships, removed ships, asteroids, bullets
+#   ships    SHIP_RECORD for every ship added or changed since the last frame
+#   removed  uint16 id of every ship gone since the last frame
+#   asteroids uint16 x[], uint16 y[], uint8 size[]
+#   bullets  uint16 x[], uint16 y[]
+#
+# Positions are fixed point in 1/POSITION_SCALE pixels. Ships are sent as a
+# delta against the previous frame: TCP delivers every frame in order, so the
+# client can patch its copy. A KEYFRAME carries all ships and replaces the
+# client's copy; it is sent on connect and after frames were skipped for a
+# client that could not keep up. Bullets and asteroids move every tick, so
+# they are always sent in full (5 bytes per asteroid, 4 per bullet).
+FRAME = struct.Struct("<I")
+WELCOME = struct.Struct("<BH")
+HEADER = struct.Struct("<BIHHHH")
+KIND_WELCOME = 0
+KIND_DELTA = 1
+KIND_KEYFRAME = 2
+SHIP_RECORD = np.dtype([("id", "<u2"), ("x", "<u2"), ("y", "<u2"), ("angle", "<u2")])
+POSITION_SCALE = 16
+MAX_SHIPS = 65535
+MAX_BACKLOG = 256 * 1024  # bytes queued for a client before frames are skipped
+
+def quantize(values):
+    return (np.asarray(values) * POSITION_SCALE).astype("<u2")
+
+def encode_frame(payload):
+    return FRAME.pack(len(payload)) + payload
+
+def encode_snapshot(kind, tick, ships, removed, asteroids, bullets):
+    return encode_frame(b"".join((
+        HEADER.pack(kind, tick, len(ships), len(removed), len(asteroids), len(bullets)),
+        ships.tobytes(), removed.astype("<u2").tobytes(),
+        quantize(asteroids.x).tobytes(), quantize(asteroids.y).tobytes(),
+        asteroids.size.astype("u1").tobytes(),
+        quantize(bullets.x).tobytes(), quantize(bullets.y).tobytes())))
+
+# Ship records that differ from the previous frame, and ids that left.
+# Both record arrays are sorted by id.
+def ship_delta(previous, current):
+    if not len(previous):
+        return current, previous["id"]
+    index = np.minimum(np.searchsorted(previous["id"], current["id"]), len(previous) - 1)
+    unchanged = previous[index] == current
+    removed = previous["id"][~np.isin(previous["id"], current["id"])]
+    return current[~unchanged], removed
+
+async def read_frame(reader):
+    size, = FRAME.unpack(await reader.readexactly(FRAME.size))
+    return await reader.readexactly(size)
+
+# Client-side copy of the world, patched by every snapshot.
+class SnapshotState:
+    def __init__(self):
+        self.tick = 0
+        self.ships = {}  # ship id -> (x, y, angle)
+        self.asteroids = SimpleNamespace(x=np.zeros(0), y=np.zeros(0), size=np.zeros(0, dtype=int))
+        self.bullets = SimpleNamespace(x=np.zeros(0), y=np.zeros(0))
+
+    def apply(self, payload):
+        kind, self.tick, changed, removed, asteroids, bullets = HEADER.unpack_from(payload)
+        offset = HEADER.size
+
+        def take(dtype, count):
+            nonlocal offset
+            values = np.frombuffer(payload, dtype, count, offset)
+            offset += values.nbytes
+            return values
+
+        changed = take(SHIP_RECORD, changed)
+        removed = take("<u2", removed)
+        if kind == KIND_KEYFRAME:
+            self.ships.clear()
+        for ship_id in removed.tolist():
+            self.ships.pop(ship_id, None)
+        for ship_id, x, y, angle in changed.tolist():
+            self.ships[ship_id] = (x / POSITION_SCALE, y / POSITION_SCALE, angle)
+        self.asteroids.x = take("<u2", asteroids) / POSITION_SCALE
+        self.asteroids.y = take("<u2", asteroids) / POSITION_SCALE
+        self.asteroids.size = take("u1", asteroids).astype(int)
+        self.bullets.x = take("<u2", bullets) / POSITION_SCALE
+        self.bullets.y = take("<u2", bullets) / POSITION_SCALE
+
+# -----------------------------
+# Server
+# -----------------------------
+class Player:
+    __slots__ = ("ship_id", "ship", "inputs", "cooldown", "writer", "needs_keyframe")
+
+    def __init__(self, ship_id, writer):
+        self.ship_id = ship_id
+        self.ship = Ship(0, 0)
+        self.inputs = 0
+        self.cooldown = 0
+        self.writer = writer
+        self.needs_keyframe = True
+
+class GameServer:
+    fire_cooldown = 8  # ticks between bullets while fire is held
+
+    def __init__(self, num_asteroids=40, tick_rate=60):
+        self.num_asteroids = num_asteroids
+        self.tick_rate = tick_rate
+        self.tick = 0
+        self.players = {}  # ship id -> Player
+        self.free_ids = []
+        self.next_id = 0
+        self.bullets = Bullets(capacity=1024)
+        self.asteroids = Asteroids(capacity=max(num_asteroids * 4, 64))
+        self.grid = SpatialHash(screen_width, screen_height)
+        self.previous = np.zeros(0, dtype=SHIP_RECORD)
+        # Counters for the periodic report
+        self.step_times = []
+        self.bytes_sent = 0
+        self.frames_skipped = 0
+        self.late_ticks = 0
+
+    def respawn(self, ship):
+        ship.x = random.uniform(0, screen_width)
+        ship.y = random.uniform(0, screen_height)
+        ship.velocity = [0, 0]
+        ship.angle = 0
+
+    async def handle_client(self, reader, writer):
+        if self.free_ids:
+            ship_id = self.free_ids.pop()
+        elif self.next_id < MAX_SHIPS:
+            ship_id = self.next_id
+            self.next_id += 1
+        else:
+            writer.close()
+            return
+        player = Player(ship_id, writer)
+        self.respawn(player.ship)
+        self.players[ship_id] = player
+        writer.write(encode_frame(WELCOME.pack(KIND_WELCOME, ship_id)))
+        try:
+            while True:
+                data = await reader.read(64)
+                if not data:
+                    break
+                player.inputs = data[-1]
+        except ConnectionError:
+            pass
+        finally:
+            del self.players[ship_id]
+            self.free_ids.append(ship_id)
+            writer.close()
+
+    def step(self):
+        bullets, asteroids = self.bullets, self.asteroids
+        for player in self.players.values():
+            ship, inputs = player.ship, player.inputs
+            if inputs & INPUT_LEFT:
+                ship.rotate(5)
+            if inputs & INPUT_RIGHT:
+                ship.rotate(-5)
+            if inputs & INPUT_THRUST:
+                dx, dy = ship.direction()
+                ship.velocity[0] += dx * 0.2
+                ship.velocity[1] += dy * 0.2
+            player.cooldown -= 1
+            if inputs & INPUT_FIRE and player.cooldown <= 0:
+                tip_x, tip_y = ship.outline()[0]
+                bullets.fire(ship.x + tip_x, ship.y + tip_y, ship.angle)
+                player.cooldown = self.fire_cooldown
+            ship.update()
+        bullets.update()
+        asteroids.update()
+
+        # Keep the field populated: new large asteroids enter from the top edge
+        missing = self.num_asteroids - len(asteroids)
+        if missing > 0:
+            asteroids.spawn(game.rng.uniform(0, screen_width, missing), 0, 3)
+
+        resolve_collisions(self.grid, bullets, asteroids)
+
+        # Ship-asteroid collisions for every ship in one query; hit ships respawn
+        players = list(self.players.values())
+        if players:
+            x = np.array([player.ship.x for player in players])
+            y = np.array([player.ship.y for player in players])
+            radius = np.array([player.ship.radius for player in players])
+            q, a = self.grid.candidate_pairs(x, y)
+            hit = np.hypot(x[q] - asteroids.x[a], y[q] - asteroids.y[a]) < asteroids.radius[a] + radius[q]
+            for i in np.unique(q[hit]).tolist():
+                self.respawn(players[i].ship)
+        self.tick += 1
+
+    def ship_records(self):
+        records = np.zeros(len(self.players), dtype=SHIP_RECORD)
+        ships = [player.ship for player in self.players.values()]
+        records["id"] = list(self.players)
+        records["x"] = quantize([ship.x for ship in ships])
+        records["y"] = quantize([ship.y for ship in ships])
+        records["angle"] = [ship.angle for ship in ships]
+        return np.sort(records, order="id")
+
+    # Send the tick's delta to every client, or a keyframe to clients that
+    # just joined or had frames skipped. Clients whose socket buffer is full
+    # are skipped instead of queueing without bound.
+    def broadcast(self):
+        current = self.ship_records()
+        changed, removed = ship_delta(self.previous, current)
+        self.previous = current
+        delta = encode_snapshot(KIND_DELTA, self.tick, changed, removed,
+                                self.asteroids, self.bullets)
+        keyframe = None
+        for player in self.players.values():
+            writer = player.writer
+            if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                player.needs_keyframe = True
+                self.frames_skipped += 1
+                continue
+            if player.needs_keyframe:
+                if keyframe is None:
+                    keyframe = encode_snapshot(KIND_KEYFRAME, self.tick, current,
+                                               np.zeros(0, dtype="<u2"),
+                                               self.asteroids, self.bullets)
+                writer.write(keyframe)
+                self.bytes_sent += len(keyframe)
+                player.needs_keyframe = False
+            else:
+                writer.write(delta)
+                self.bytes_sent += len(delta)
+
+    def report(self, elapsed):
+        if not self.step_times:
+            return
+        p50, p99 = np.percentile(self.step_times, [50, 99]) * 1000
+        print("tick %d  ships %d  asteroids %d  bullets %d  step p50 %.2f ms p99 %.2f ms "
+              "(budget %.2f)  out %.0f KB/s  skipped frames %d  late ticks %d"
+              % (self.tick, len(self.players), len(self.asteroids), len(self.bullets),
+                 p50, p99, 1000 / self.tick_rate, self.bytes_sent / elapsed / 1024,
+                 self.frames_skipped, self.late_ticks))
+        sys.stdout.flush()
+        self.step_times = []
+        self.bytes_sent = 0
+        self.frames_skipped = 0
+        self.late_ticks = 0
+
+    # Fixed-tick loop. A tick that starts more than one tick late drops the
+    # backlog instead of running several ticks back to back.
+    async def run(self, port=PORT, report_every=5.0):
+        server = await asyncio.start_server(self.handle_client, HOST, port)
+        print("serving on %s:%d at %d ticks/s" % (HOST, port, self.tick_rate))
+        loop = asyncio.get_running_loop()
+        period = 1 / self.tick_rate
+        next_tick = loop.time()
+        last_report = next_tick
+        async with server:
+            while True:
+                start = time.perf_counter()
+                self.step()
+                self.broadcast()
+                self.step_times.append(time.perf_counter() - start)
+
+                now = loop.time()
+                if now - last_report >= report_every:
+                    self.report(now - last_report)
+                    last_report = now
+                next_tick += period
+                if now > next_tick + period:
+                    self.late_ticks += 1
+                    next_tick = now
+                await asyncio.sleep(max(0.0, next_tick - now))
+
+# -----------------------------
+# Client
+# -----------------------------
+async def run_client(port=PORT):
+    game.init_display()
+    pygame.display.set_caption("Asteroids (online)")
+    reader, writer = await asyncio.open_connection(HOST, port)
+    kind, ship_id = WELCOME.unpack(await read_frame(reader))
+    state = SnapshotState()
+    sprites = SpriteCache()
+
+    async def receive():
+        while True:
+            state.apply(await read_frame(reader))
+
+    receiver = asyncio.create_task(receive())
+    inputs = 0
+    try:
+        while not receiver.done():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+            keys = pygame.key.get_pressed()
+            pressed = ((keys[pygame.K_LEFT] and INPUT_LEFT) | (keys[pygame.K_RIGHT] and INPUT_RIGHT)
+                       | (keys[pygame.K_UP] and INPUT_THRUST) | (keys[pygame.K_SPACE] and INPUT_FIRE))
+            if pressed != inputs:
+                inputs = pressed
+                writer.write(bytes((inputs,)))
+
+            game.screen.fill(BLACK)
+            if ship_id in state.ships:
+                own = Ship(*state.ships[ship_id][:2])
+                own.angle = state.ships[ship_id][2]
+                sequence = sprites.batch(own, state.bullets, state.asteroids)
+                sequence.extend((sprites.ships[angle],
+                                 (int(x) - sprites.ship_offset, int(y) - sprites.ship_offset))
+                                for other, (x, y, angle) in state.ships.items() if other != ship_id)
+                game.screen.blits(sequence, doreturn=False)
+            pygame.display.update()
+            await asyncio.sleep(1 / 60)
+    finally:
+        receiver.cancel()
+        writer.close()
+        pygame.quit()
+
+# -----------------------------
+# Load Generator
+# -----------------------------
+# Each bot holds a random key combination for a random time and counts the
+# snapshots it receives. Only snapshot headers are parsed so the generator
+# itself stays cheap.
+class BotStats:
+    def __init__(self):
+        self.connected = 0
+        self.snapshots = 0
+        self.bytes = 0
+        self.ticks_missed = 0
+
+async def run_bot(port, stats, stop):
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        await read_frame(reader)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        return
+    stats.connected += 1
+
+    async def press_keys():
+        while True:
+            writer.write(bytes((random.getrandbits(4),)))
+            await asyncio.sleep(random.uniform(0.1, 1.0))
+
+    presser = asyncio.create_task(press_keys())
+    last_tick = None
+    try:
+        while not stop.is_set():
+            payload = await read_frame(reader)
+            tick = HEADER.unpack_from(payload)[1]
+            if last_tick is not None:
+                stats.ticks_missed += tick - last_tick - 1
+            last_tick = tick
+            stats.snapshots += 1
+            stats.bytes += FRAME.size + len(payload)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        presser.cancel()
+        writer.close()
+        stats.connected -= 1
+
+async def run_bots(count, duration, port=PORT, ramp=100):
+    stats = BotStats()
+    stop = asyncio.Event()
+    bots = []
+    for i in range(count):
+        bots.append(asyncio.create_task(run_bot(port, stats, stop)))
+        await asyncio.sleep(1 / ramp)  # connect at ramp bots per second
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        snapshots, received = stats.snapshots, stats.bytes
+        await asyncio.sleep(1.0)
+        per_bot = (stats.snapshots - snapshots) / max(stats.connected, 1)
+        print("bots %d  snapshots/s per bot %.1f  in %.0f KB/s  missed ticks %d"
+              % (stats.connected, per_bot, (stats.bytes - received) / 1024, stats.ticks_missed))
+        sys.stdout.flush()
+    stop.set()
+    for bot in bots:
+        bot.cancel()
+    await asyncio.gather(*bots, return_exceptions=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asteroids server, client and load generator")
+    parser.add_argument("--port", type=int, default=PORT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the authoritative server")
+    serve.add_argument("--tick-rate", type=int, default=60)
+    serve.add_argument("--asteroids", type=int, default=40,
+                       help="asteroids kept in play")
+    serve.add_argument("--seed", type=int, default=None)
+    commands.add_parser("client", help="join a server with a pygame window")
+    bots = commands.add_parser("bots", help="connect bot clients to a server")
+    bots.add_argument("--count", type=int, default=100)
+    bots.add_argument("--duration", type=float, default=30.0,
+                      help="seconds to run after all bots connected")
+    bots.add_argument("--ramp", type=float, default=100.0,
+                      help="bots connected per second")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "serve":
+            random.seed(args.seed)
+            game.rng = np.random.default_rng(args.seed)
+            asyncio.run(GameServer(args.asteroids, args.tick_rate).run(args.port))
+        elif args.command == "client":
+            asyncio.run(run_client(args.port))
+        else:
+            asyncio.run(run_bots(args.count, args.duration, args.port, args.ramp))
+    except KeyboardInterrupt:
+        pass
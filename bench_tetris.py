@@ -0,0 +1,232 @@
+import copy
+import itertools
+import random
+import time
+
+import tetris
+
+# Benchmark and correctness check for tetris.clear_rows(), plus
+# correctness checks for tetris.drop_distance() and the TetrisEngine
+# placement evaluator.
+# Run with: python bench_tetris.py
+
+rows = tetris.grid_rows
+cols = tetris.grid_cols
+
+# -----------------------------
+# Previous implementation (dict of locked positions), kept for comparison
+# -----------------------------
+def legacy_create_grid(locked_positions={}):
+    grid = [[(0, 0, 0) for _ in range(cols)] for _ in range(rows)]
+    for i in range(len(grid)):
+        for j in range(len(grid[i])):
+            if (j, i) in locked_positions:
+                grid[i][j] = locked_positions[(j, i)]
+    return grid
+
+def legacy_clear_rows(grid, locked):
+    cleared = 0
+    for i in range(len(grid)-1, -1, -1):
+        row = grid[i]
+        if (0, 0, 0) not in row:
+            cleared += 1
+            index = i
+            for j in range(len(row)):
+                try:
+                    del locked[(j, i)]
+                except:
+                    continue
+    if cleared > 0:
+        for key in sorted(list(locked), key=lambda x: x[1], reverse=True):
+            x, y = key
+            if y < index:
+                newKey = (x, y + cleared)
+                locked[newKey] = locked.pop(key)
+    return cleared
+
+# -----------------------------
+# Board construction
+# -----------------------------
+def dense_cells(full_rows, rng, density=0.9):
+    """Return {(x, y): color index} with the given rows full and every other row
+    filled to roughly `density` but never complete."""
+    cells = {}
+    for y in range(rows):
+        if y in full_rows:
+            row = range(cols)
+        else:
+            row = [x for x in range(cols) if rng.random() < density]
+            if len(row) == cols:
+                row.pop(rng.randrange(cols))
+        for x in row:
+            cells[(x, y)] = rng.randrange(1, len(tetris.cell_colors))
+    return cells
+
+def make_board(cells):
+    board = tetris.Board()
+    for (x, y), color in cells.items():
+        board.rows[y] |= 1 << x
+        board.colors[y * cols + x] = color
+        board.fill[y] += 1
+    tetris.update_tops(board)
+    return board
+
+def make_locked(cells):
+    return {pos: tetris.cell_colors[color] for pos, color in cells.items()}
+
+def expected_cells(cells, full_rows):
+    """Reference result: drop the full rows and shift each remaining cell down by
+    the number of full rows below it."""
+    result = {}
+    for (x, y), color in cells.items():
+        if y not in full_rows:
+            result[(x, y + sum(1 for r in full_rows if r > y))] = color
+    return result
+
+def board_cells(board):
+    return {(x, y): board.colors[y * cols + x]
+            for y in range(rows) for x in range(cols) if board.rows[y] >> x & 1}
+
+# -----------------------------
+# Checks
+# -----------------------------
+def check_all_patterns(rng):
+    """Clear every pattern of 1-4 full rows and compare
+    both implementations against the reference result."""
+    patterns = 0
+    legacy_wrong = 0
+    for count in range(1, 5):
+        for full_rows in itertools.combinations(range(rows), count):
+            full_rows = set(full_rows)
+            cells = dense_cells(full_rows, rng)
+            expected = expected_cells(cells, full_rows)
+
+            board = make_board(cells)
+            assert tetris.clear_rows(board) == count
+            assert board_cells(board) == expected, sorted(full_rows)
+            assert board.fill == [sum(1 for (x, y) in expected if y == r) for r in range(rows)]
+
+            locked = make_locked(cells)
+            legacy_clear_rows(legacy_create_grid(locked), locked)
+            if locked != make_locked(expected):
+                legacy_wrong += 1
+            patterns += 1
+    return patterns, legacy_wrong
+
+def probe_drop_distance(piece, board):
+    """Reference result: move the piece down one row at a time until it collides."""
+    probe = tetris.Piece(piece.x, piece.y, piece.id)
+    probe.rotation = piece.rotation
+    distance = 0
+    while True:
+        probe.y += 1
+        if not tetris.valid_space(probe, board):
+            return distance
+        distance += 1
+
+def check_drop_distance(rng, boards=200):
+    """Compare drop_distance() with valid_space() probing for every piece,
+    rotation and column, from the spawn row down, on random boards with
+    empty and ragged columns and overhangs."""
+    checked = 0
+    for _ in range(boards):
+        cells = {}
+        for x in range(cols):
+            # Leave about a third of the columns empty: only drops into
+            # empty columns are longer than the grid is tall.
+            height = rng.randrange(rows - 4) if rng.random() < 0.7 else 0
+            for y in range(rows - height, rows):
+                if rng.random() < 0.8:
+                    cells[(x, y)] = rng.randrange(1, len(tetris.cell_colors))
+        board = make_board(cells)
+        for piece_id in range(len(tetris.shapes)):
+            piece = tetris.Piece(0, 0, piece_id)
+            for rotation, (left, right, masks) in enumerate(tetris.shape_row_masks[piece_id]):
+                piece.rotation = rotation
+                for x in range(-left, cols - right):
+                    piece.x = x
+                    for y in range(rows):
+                        piece.y = y
+                        if not tetris.valid_space(piece, board):
+                            break
+                        expected = probe_drop_distance(piece, board)
+                        assert tetris.drop_distance(piece, board) == expected, (piece_id, rotation, x, y)
+                        checked += 1
+    return checked
+
+def board_score(board, weights=tetris.placement_weights):
+    """Reference score of a board after a piece locked, before full rows clear."""
+    w_height, w_lines, w_holes, w_bumps = weights
+    heights = [rows - top for top in board.tops]
+    holes = sum(1 for x in range(cols) for y in range(board.tops[x], rows)
+                if not board.rows[y] >> x & 1)
+    lines = sum(1 for count in board.fill if count == cols)
+    bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+    return w_height * sum(heights) + w_lines * lines + w_holes * holes + w_bumps * bumpiness
+
+def check_placements(games=50, pieces=60):
+    """Play seeded games choosing best and random placements in turn. Every
+    legal placement's evaluate_placements() score must match a brute-force
+    lock found by valid_space() probing, and apply_placement() must leave the
+    board that was scored."""
+    checked = 0
+    for seed in range(games):
+        engine = tetris.TetrisEngine(seed)
+        choices = random.Random(seed)
+        for turn in range(pieces):
+            piece = engine.current_piece
+            rotations, columns, scores = tetris.evaluate_placements(engine.board, piece.id)
+            scored = {(r, x): s for r, x, s in zip(rotations.tolist(), columns.tolist(), scores.tolist())}
+            locked = {}
+            for rotation, x in engine.legal_placements():
+                board = copy.deepcopy(engine.board)
+                probe = tetris.Piece(x, piece.y, piece.id)
+                probe.rotation = rotation
+                probe.y += probe_drop_distance(probe, board)
+                tetris.lock_piece(probe, board)
+                if min(y for x, y in tetris.convert_shape_format(probe)) < 1:
+                    assert scored[(rotation, x)] == float('-inf'), (seed, turn, rotation, x)
+                else:
+                    assert abs(scored[(rotation, x)] - board_score(board)) < 1e-9, (seed, turn, rotation, x)
+                tetris.clear_rows(board)
+                locked[(rotation, x)] = board
+                checked += 1
+            placement = engine.best_placement() if turn % 2 else choices.choice(list(locked))
+            engine.apply_placement(*placement)
+            expected = locked[placement]
+            assert engine.board.rows == expected.rows and engine.board.colors == expected.colors, (seed, turn)
+            if engine.lost:
+                break
+    return checked
+
+def time_per_call(run, setups):
+    total = 0.0
+    for args in setups:
+        start = time.perf_counter()
+        run(*args)
+        total += time.perf_counter() - start
+    return total / len(setups) * 1e6
+
+def benchmark(rng, samples=2000):
+    print('%-10s %14s %14s %8s' % ('rows', 'legacy (us)', 'bitboard (us)', 'speedup'))
+    for count in range(0, 5):
+        patterns = [set(rng.sample(range(rows - 8, rows), count)) for _ in range(samples)]
+        boards = [dense_cells(full_rows, rng) for full_rows in patterns]
+
+        legacy_args = []
+        for cells in boards:
+            locked = make_locked(cells)
+            legacy_args.append((legacy_create_grid(locked), locked))
+        legacy = time_per_call(legacy_clear_rows, legacy_args)
+
+        bitboard = time_per_call(tetris.clear_rows, [(make_board(cells),) for cells in boards])
+        print('%-10d %14.2f %14.2f %7.1fx' % (count, legacy, bitboard, legacy / bitboard))
+
+if __name__ == '__main__':
+    rng = random.Random(0)
+    patterns, legacy_wrong = check_all_patterns(rng)
+    print('clear_rows correct for all %d patterns of 1-4 full rows '
+          '(legacy implementation wrong on %d)' % (patterns, legacy_wrong))
+    print('drop_distance correct for %d piece positions' % check_drop_distance(rng))
+    print('evaluate_placements and apply_placement agree for %d placements' % check_placements())
+    benchmark(rng)
@@ -1,7 +1,11 @@
 import pygame
+import argparse
+import glob
+import os
 import sys
 import math
 import random
+import numpy as np
 
 # -------------------------------
 # Global Settings and Maze Data
@@ -16,61 +20,587 @@ screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Pac‑Man")
 clock = pygame.time.Clock()
 
-# Maze definition (11 rows x 21 columns)
-# In these strings, '#' represents a wall; any other character represents an open cell with a dot.
-maze = [
-    "#####################",
-    "#........##.........#",
-    "#.####...##...####..#",
-    "#...................#",
-    "#.####.####.####....#",
-    "#...................#",
-    "#.####.####.####....#",
-    "#...................#",
-    "#.####...##...####..#",
-    "#........##.........#",
-    "#####################"
-]
-
-ROWS = len(maze)
-COLS = len(maze[0])
 BLOCK_SIZE = 30  # Each cell is 30x30 pixels
-MAZE_WIDTH = COLS * BLOCK_SIZE
-MAZE_HEIGHT = ROWS * BLOCK_SIZE
 
-# Center the maze on the screen.
-TOP_LEFT_X = (SCREEN_WIDTH - MAZE_WIDTH) // 2
-TOP_LEFT_Y = (SCREEN_HEIGHT - MAZE_HEIGHT) // 2
+# Levels are text files in the levels directory next to this script. In a
+# level '#' is a wall, '.' an open cell with a dot and ' ' an open cell
+# without one. 'P' marks Pac‑Man's start cell and the digits '1' to '4' the
+# ghosts' start cells (see GHOST_TYPES); start cells have no dot.
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+LEVEL_CHARS = "#. P1234"
+MIN_MAZE_SIZE = 11    # generated mazes, see generate_maze()
+MAX_MAZE_SIZE = 1000  # largest number of rows or columns of any level
+LOOP_FRACTION = 0.3   # share of inner walls generate_maze() opens
+
+# Levels larger than the screen scroll: the camera shows VIEW_COLS x VIEW_ROWS
+# cells and re-centers on Pac‑Man when he gets within VIEW_MARGIN cells of
+# an edge of the view.
+VIEW_COLS = SCREEN_WIDTH // BLOCK_SIZE
+VIEW_ROWS = SCREEN_HEIGHT // BLOCK_SIZE
+VIEW_MARGIN = 5
+
+# The all-pairs path table needs three bytes per pair of open cells and
+# its build time grows with (open cells)² x diameter / 64 (see PathTable),
+# so it is only built for levels with at most this many open cells. That
+# keeps even the worst case, one winding corridor whose diameter is the
+# cell count, under a second. Larger levels use LocalPaths around Pac‑Man
+# instead.
+PATH_TABLE_MAX_CELLS = 1200
+LOCAL_PATH_RADIUS = 40  # cells searched around Pac‑Man by LocalPaths
+
+# The current level, set by load_level(): the maze rows, their size, where
+# the maze is drawn (centered on the screen), the exit mask of every cell,
+# the path table, the corridor graph and the start cells.
+maze = []
+ROWS = COLS = 0
+MAZE_WIDTH = MAZE_HEIGHT = 0
+TOP_LEFT_X = TOP_LEFT_Y = 0
+exits = bytearray()
+paths = None        # PathTable, or None for large levels
+local_paths = None  # LocalPaths for large levels, or None
+graph = None
+PACMAN_START = (0, 0)
+GHOST_STARTS = []  # (ghost digit, cell) in digit order
+
+# Colors
+BLACK = (0, 0, 0)
+WALL_COLOR = (0, 0, 255)
+DOT_COLOR = (255, 255, 255)
+DOT_RADIUS = 3
 
 # -------------------------------
 # Utility Functions
 # -------------------------------
 
+# Movement directions as (dx, dy). Path tables and the corridor graph store
+# indices into this list; bit 1 << d of a cell's exit mask is set when the
+# neighbour in DIRECTIONS[d] is open. Standing still is always allowed.
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+DIRECTION_BITS = {(1, 0): 1, (-1, 0): 2, (0, 1): 4, (0, -1): 8, (0, 0): 0}
+OPPOSITE = [1, 0, 3, 2]
+UNREACHABLE = 0xFFFF
+
 def can_move(row, col, direction):
     """
     Check if moving from cell (row, col) in the grid by 'direction' (dx, dy)
     is allowed (i.e. does not hit a wall).
     """
-    dx, dy = direction
-    new_row = row + dy
-    new_col = col + dx
-    if new_row < 0 or new_row >= ROWS or new_col < 0 or new_col >= COLS:
-        return False
-    return maze[new_row][new_col] != '#'
+    bit = DIRECTION_BITS[direction]
+    return (exits[row * COLS + col] & bit) == bit
+
+def open_mask(grid, chars="#", match=False):
+    """
+    Return a rows x cols boolean array that is True where the grid character
+    is not in chars (or, with match=True, where it is).
+    """
+    codes = np.frombuffer("".join(grid).encode("ascii"), dtype=np.uint8)
+    mask = np.isin(codes, np.frombuffer(chars.encode("ascii"), dtype=np.uint8))
+    return (mask if match else ~mask).reshape(len(grid), len(grid[0]))
+
+class DotGrid:
+    """
+    The dots left in the maze: one bit per cell, set while the cell still
+    has a dot, plus a live count. A 1000x1000 maze takes 125 KB. Supports
+    'cell in dots', dots.discard(cell) and len(dots) like a set of cells.
+    """
+
+    def __init__(self, grid):
+        self.cols = len(grid[0])
+        has_dot = open_mask(grid, ".", match=True).ravel()
+        self.bits = bytearray(np.packbits(has_dot, bitorder="little").tobytes())
+        self.count = int(has_dot.sum())
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, cell):
+        i = cell[0] * self.cols + cell[1]
+        return (self.bits[i >> 3] >> (i & 7)) & 1 == 1
+
+    def discard(self, cell):
+        i = cell[0] * self.cols + cell[1]
+        bit = 1 << (i & 7)
+        if self.bits[i >> 3] & bit:
+            self.bits[i >> 3] &= ~bit
+            self.count -= 1
 
 def create_dots():
-    """Return a set of all (row, col) positions that are not walls (i.e. that get a dot)."""
-    dots_set = set()
-    for r in range(ROWS):
-        for c in range(COLS):
-            if maze[r][c] != '#':
-                dots_set.add((r, c))
-    return dots_set
+    """Return the dots of the current level (every cell marked '.')."""
+    return DotGrid(maze)
+
+# -------------------------------
+# Path Table
+# -------------------------------
+
+class PathTable:
+    """
+    All-pairs shortest paths between the open cells of a maze, computed once.
+
+    index[row, col]  -> cell number, or -1 for a wall
+    cells[i]         -> (row, col) of cell i
+    neighbors[i, d]  -> cell one step from i in DIRECTIONS[d], or -1
+    dist[i, j]       -> steps on a shortest path from i to j (UNREACHABLE if none)
+    next_dir[i, j]   -> index into DIRECTIONS of the first step from i towards j,
+                        or -1 when i == j or j cannot be reached
+    """
+
+    def __init__(self, grid):
+        rows, cols = len(grid), len(grid[0])
+        self.cells = np.argwhere(open_mask(grid))
+        n = len(self.cells)
+        self.index = np.full((rows, cols), -1, dtype=np.int32)
+        self.index[self.cells[:, 0], self.cells[:, 1]] = np.arange(n)
+
+        self.neighbors = np.full((n, len(DIRECTIONS)), -1, dtype=np.int32)
+        for d, (dx, dy) in enumerate(DIRECTIONS):
+            r = self.cells[:, 0] + dy
+            c = self.cells[:, 1] + dx
+            inside = (r >= 0) & (r < rows) & (c >= 0) & (c < cols)
+            self.neighbors[inside, d] = self.index[r[inside], c[inside]]
+
+        # Breadth-first search from every cell at once, bit-parallel: row j
+        # of seen and frontier is a bit set over the source cells, packed in
+        # 64-bit words, so a step ORs rows of n / 64 words and only the newly
+        # reached bits are unpacked into dist. Every pair is written once,
+        # so the cost is O(n² / 64 · diameter) word operations plus O(n²)
+        # writes rather than n² per step.
+        self.dist = np.full((n, n), UNREACHABLE, dtype=np.uint16)
+        np.fill_diagonal(self.dist, 0)
+        steps = np.where(self.neighbors >= 0, self.neighbors, n)  # n: an empty row
+        words = (n + 63) // 64
+        packed = np.zeros((n + 1, words * 8), dtype=np.uint8)
+        packed[:n, :(n + 7) // 8] = np.packbits(np.eye(n, dtype=bool), axis=1, bitorder="little")
+        frontier = packed.view(np.uint64)
+        seen = frontier[:n].copy()
+        step = 0
+        while True:
+            step += 1
+            reached = frontier[steps[:, 0]]
+            for d in range(1, len(DIRECTIONS)):
+                reached |= frontier[steps[:, d]]
+            reached &= ~seen
+            changed = np.flatnonzero(reached)
+            if not len(changed):
+                break
+            seen |= reached
+            frontier[:n] = reached
+            bits = np.unpackbits(reached.ravel()[changed].view(np.uint8), bitorder="little")
+            found = np.flatnonzero(bits)
+            targets, blocks = np.divmod(changed[found // 64], words)
+            self.dist[blocks * 64 + found % 64, targets] = step
+
+        # The first step from i towards j goes to the neighbour closest to j
+        # (the first such direction on ties). Paths are undirected, so
+        # dist[neighbour, j] is that neighbour's distance to j.
+        self.next_dir = np.full((n, n), -1, dtype=np.int8)
+        best = np.full((n, n), UNREACHABLE, dtype=np.uint16)
+        for d in range(len(DIRECTIONS)):
+            has = self.neighbors[:, d] >= 0
+            via = self.dist[self.neighbors[has, d]]
+            closer = via < best[has]
+            best[has] = np.where(closer, via, best[has])
+            self.next_dir[has] = np.where(closer, d, self.next_dir[has])
+        np.fill_diagonal(self.next_dir, -1)
+
+class LocalPaths:
+    """
+    Shortest-path distances to Pac‑Man's cell within LOCAL_PATH_RADIUS steps,
+    for levels too large for a PathTable. The search is redone only when
+    Pac‑Man enters another cell and its cost is bounded by the radius, not
+    the maze size. Beyond the radius, and for targets other than Pac‑Man,
+    distance() falls back to the straight-line (Manhattan) estimate the
+    arcade ghosts use.
+    """
+
+    def __init__(self, exits, cols, radius=LOCAL_PATH_RADIUS):
+        self.exits = exits
+        self.cols = cols
+        self.radius = radius
+        self.origin = None
+        self.dist = {}  # cell number -> steps to origin
+
+    def update(self, cell):
+        if cell == self.origin:
+            return
+        self.origin = cell
+        cols, exits = self.cols, self.exits
+        steps = [1, -1, cols, -cols]  # DIRECTIONS as cell number offsets
+        start = cell[0] * cols + cell[1]
+        self.dist = dist = {start: 0}
+        frontier = [start]
+        for step in range(1, self.radius + 1):
+            reached = []
+            for i in frontier:
+                mask = exits[i]
+                for d in range(4):
+                    if mask & (1 << d) and i + steps[d] not in dist:
+                        dist[i + steps[d]] = step
+                        reached.append(i + steps[d])
+            frontier = reached
+
+    def distance(self, cell, target):
+        if target == self.origin:
+            steps = self.dist.get(cell[0] * self.cols + cell[1])
+            if steps is not None:
+                return steps
+            return self.radius + abs(cell[0] - target[0]) + abs(cell[1] - target[1])
+        return abs(cell[0] - target[0]) + abs(cell[1] - target[1])
+
+class CorridorGraph:
+    """
+    The junction/corridor structure of a maze. Junctions are the open cells
+    where an actor has a choice or must turn back, i.e. those without exactly
+    two exits. Every other open cell lies on a corridor with one way in and
+    one way out, so a corridor can be followed without further decisions.
+
+    route(cell, d) -> (end, runs): leaving 'cell' by DIRECTIONS[d], the
+    junction reached and the straight runs (direction index, length in cells)
+    that lead there. With precompile, routes from every junction are
+    compiled up front; other routes (from start cells, or all of them in
+    large mazes) are compiled the first time they are asked for.
+    """
+
+    def __init__(self, exits, rows, cols, precompile=True):
+        self.exits = exits
+        self.cols = cols
+        mask = np.frombuffer(exits, dtype=np.uint8)
+        exit_count = np.unpackbits(mask[:, None], axis=1).sum(axis=1)
+        # Cell numbers (row * cols + col) of the junctions
+        self.junctions = np.flatnonzero((mask > 0) & (exit_count != 2))
+        self.routes = {}
+        if precompile:
+            for i in self.junctions.tolist():
+                for d in range(len(DIRECTIONS)):
+                    if exits[i] & (1 << d):
+                        self.route(divmod(i, cols), d)
+
+    def route(self, cell, d):
+        key = (cell, d)
+        if key not in self.routes:
+            row, col = cell
+            runs = []
+            run = 0
+            while True:
+                dx, dy = DIRECTIONS[d]
+                row += dy
+                col += dx
+                run += 1
+                mask = self.exits[row * self.cols + col]
+                # Stop at a junction, or back at the start of a loop without any
+                if (row, col) == cell or bin(mask).count("1") != 2:
+                    break
+                turn = (mask & ~(1 << OPPOSITE[d])).bit_length() - 1
+                if turn != d:
+                    runs.append((d, run))
+                    run = 0
+                    d = turn
+            runs.append((d, run))
+            self.routes[key] = ((row, col), tuple(runs))
+        return self.routes[key]
+
+# -------------------------------
+# Level Loading
+# -------------------------------
+
+def read_level(path):
+    """
+    Read a level file and return its rows as a list of equal-length strings.
+    Raise ValueError if the file is not a valid level.
+    """
+    with open(path) as f:
+        lines = [line.rstrip("\r\n") for line in f]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    check_level(lines, path)
+    return lines
+
+def check_level(lines, path="level"):
+    """Raise ValueError if the rows in lines do not make a valid level."""
+    if not lines:
+        raise ValueError("%s: empty level" % path)
+    width = len(lines[0])
+    for number, line in enumerate(lines, 1):
+        if len(line) != width:
+            raise ValueError("%s:%d: every row must be %d characters wide" % (path, number, width))
+        unknown = set(line) - set(LEVEL_CHARS)
+        if unknown:
+            raise ValueError("%s:%d: unknown characters %r" % (path, number, "".join(sorted(unknown))))
+    text = "".join(lines)
+    if text.count("P") != 1:
+        raise ValueError("%s: needs exactly one Pac‑Man start 'P'" % path)
+    if not any(digit in text for digit in "1234"):
+        raise ValueError("%s: needs at least one ghost start '1' to '4'" % path)
+    if any(text.count(digit) > 1 for digit in "1234"):
+        raise ValueError("%s: each ghost start may appear only once" % path)
+    if width > MAX_MAZE_SIZE or len(lines) > MAX_MAZE_SIZE:
+        raise ValueError("%s: levels may have at most %d rows and columns" % (path, MAX_MAZE_SIZE))
+
+def compile_exits(grid):
+    """Return a bytearray with the exit mask of every cell of grid, row by row."""
+    rows, cols = len(grid), len(grid[0])
+    is_open = open_mask(grid)
+    padded = np.pad(is_open, 1)
+    mask = np.zeros((rows, cols), dtype=np.uint8)
+    for d, (dx, dy) in enumerate(DIRECTIONS):
+        neighbour_open = padded[1 + dy:1 + dy + rows, 1 + dx:1 + dx + cols]
+        mask |= (is_open & neighbour_open).astype(np.uint8) << d
+    return bytearray(mask.tobytes())
+
+def unreachable_cell(grid, level_exits, start):
+    """Return an open cell that cannot be reached from start, or None."""
+    cols = len(grid[0])
+    steps = [1, -1, cols, -cols]  # DIRECTIONS as cell number offsets
+    seen = bytearray(len(level_exits))
+    seen[start[0] * cols + start[1]] = 1
+    stack = [start[0] * cols + start[1]]
+    while stack:
+        i = stack.pop()
+        mask = level_exits[i]
+        for d in range(4):
+            if mask & (1 << d) and not seen[i + steps[d]]:
+                seen[i + steps[d]] = 1
+                stack.append(i + steps[d])
+    missed = open_mask(grid).ravel() & ~np.frombuffer(bytes(seen), dtype=bool)
+    if missed.any():
+        return divmod(int(np.argmax(missed)), cols)
+    return None
+
+def compile_level(level):
+    """
+    Read and check a level file or list of row strings without making it
+    current. Return (rows, start cells by character, exit masks), which
+    load_level() also accepts. Raise ValueError if it is not a valid level.
+    """
+    if isinstance(level, str):
+        name, grid = level, read_level(level)
+    else:
+        name, grid = "generated level", level
+        check_level(grid, name)
+    starts = {}
+    for ch in "P1234":
+        found = [(r, line.index(ch)) for r, line in enumerate(grid) if ch in line]
+        if found:
+            starts[ch] = found[0]
+    level_exits = compile_exits(grid)
+    missed = unreachable_cell(grid, level_exits, starts["P"])
+    if missed is not None:
+        raise ValueError("%s: cell (%d, %d) cannot be reached from the start" % (name, missed[0], missed[1]))
+    return grid, starts, level_exits
+
+def load_level(level):
+    """
+    Make a level current: 'level' is a level file, a list of row strings
+    (see generate_maze()) or the result of compile_level(). It is compiled
+    into the exit masks, path table or local paths, corridor graph and start
+    cells (see the globals above). Raise ValueError if it is not a valid
+    level.
+    """
+    global maze, ROWS, COLS, MAZE_WIDTH, MAZE_HEIGHT, TOP_LEFT_X, TOP_LEFT_Y
+    global exits, paths, local_paths, graph, PACMAN_START, GHOST_STARTS
+    if not isinstance(level, tuple):
+        level = compile_level(level)
+    grid, starts, level_exits = level
+    maze = grid
+    ROWS = len(grid)
+    COLS = len(grid[0])
+    MAZE_WIDTH = COLS * BLOCK_SIZE
+    MAZE_HEIGHT = ROWS * BLOCK_SIZE
+    # Center the maze on the screen; larger mazes start at the top left and
+    # scroll (see Camera).
+    TOP_LEFT_X = max(0, (SCREEN_WIDTH - MAZE_WIDTH) // 2)
+    TOP_LEFT_Y = max(0, (SCREEN_HEIGHT - MAZE_HEIGHT) // 2)
+    exits = level_exits
+    small = int(open_mask(grid).sum()) <= PATH_TABLE_MAX_CELLS
+    paths = PathTable(grid) if small else None
+    local_paths = None if small else LocalPaths(exits, COLS)
+    graph = CorridorGraph(exits, ROWS, COLS, precompile=small)
+    PACMAN_START = starts["P"]
+    GHOST_STARTS = sorted((ch, cell) for ch, cell in starts.items() if ch != "P")
+
+def generate_maze(cols, rows, seed=None):
+    """
+    Return the rows of a random cols x rows level. The cells at odd
+    coordinates are joined into a spanning tree by opening, for each one, the
+    wall to its north or west neighbour at random (the "binary tree"
+    algorithm), then LOOP_FRACTION of the remaining walls between them are
+    opened so the maze has loops. Every open cell has a dot; Pac‑Man starts
+    in the middle and the four ghosts eight cells away diagonally.
+    """
+    if not (MIN_MAZE_SIZE <= cols <= MAX_MAZE_SIZE and MIN_MAZE_SIZE <= rows <= MAX_MAZE_SIZE):
+        raise ValueError("maze size must be between %d and %d cells" % (MIN_MAZE_SIZE, MAX_MAZE_SIZE))
+    rng = np.random.default_rng(seed)
+    grid = np.full((rows, cols), ord('#'), dtype=np.uint8)
+    lattice_rows, lattice_cols = (rows - 1) // 2, (cols - 1) // 2
+    grid[1:2 * lattice_rows:2, 1:2 * lattice_cols:2] = ord('.')
+    north = rng.random((lattice_rows, lattice_cols)) < 0.5
+    north[:, 0] = True
+    north[0, :] = False
+    west = ~north
+    west[:, 0] = False
+    r, c = np.nonzero(north)
+    grid[2 * r, 2 * c + 1] = ord('.')
+    r, c = np.nonzero(west)
+    grid[2 * r + 1, 2 * c] = ord('.')
+    for walls in (grid[1:2 * lattice_rows:2, 2:2 * lattice_cols - 1:2],
+                  grid[2:2 * lattice_rows - 1:2, 1:2 * lattice_cols:2]):
+        walls[rng.random(walls.shape) < LOOP_FRACTION] = ord('.')
+
+    last_row, last_col = 2 * lattice_rows - 1, 2 * lattice_cols - 1
+    row, col = 2 * (lattice_rows // 2) + 1, 2 * (lattice_cols // 2) + 1
+    grid[row, col] = ord('P')
+    for digit, (dr, dc) in zip(b"1234", [(-8, 8), (-8, -8), (8, 8), (8, -8)]):
+        grid[min(max(row + dr, 1), last_row), min(max(col + dc, 1), last_col)] = digit
+    return [line.tobytes().decode("ascii") for line in grid]
+
+def level_files():
+    """Return the level files in LEVEL_DIR in play order."""
+    return sorted(glob.glob(os.path.join(LEVEL_DIR, "*.txt")))
+
+# The first level is loaded on import so the module always has a maze.
+load_level(os.path.join(LEVEL_DIR, "level1.txt"))
+
+def nearest_open_cell(row, col):
+    """Return the open cell closest to (row, col), the topmost on ties."""
+    for radius in range(ROWS + COLS):
+        for dr in range(-radius, radius + 1):
+            r = row + dr
+            dc = radius - abs(dr)
+            for c in ((col - dc, col + dc) if dc else (col,)):
+                if 0 <= r < ROWS and 0 <= c < COLS and maze[r][c] != '#':
+                    return r, c
+
+def cell_ahead(row, col, direction, steps):
+    """Return the cell up to 'steps' open cells ahead of (row, col) in 'direction'."""
+    dx, dy = direction
+    for _ in range(steps):
+        if not can_move(row, col, direction):
+            break
+        row += dy
+        col += dx
+    return row, col
+
+# Ghost colors, the number of cells ahead of Pac‑Man each one aims for in
+# chase mode and the maze corner (row, column as fractions of the maze size)
+# it scatters to, by the digit marking its start cell.
+GHOST_TYPES = {
+    "1": ((255, 0, 0), 0, (0, 1)),      # Red: chases Pac‑Man directly
+    "2": ((255, 184, 255), 4, (0, 0)),  # Pink: ambushes four cells ahead
+    "3": ((0, 255, 255), 2, (1, 1)),    # Cyan
+    "4": ((255, 184, 82), 0, (1, 0)),   # Orange
+}
+
+# Ghost modes alternate between scattering to a home corner and chasing
+# Pac‑Man, arcade style: (mode, duration in frames), the last one is open-ended.
+MODE_SCHEDULE = [("scatter", 7 * 60), ("chase", 20 * 60), ("scatter", 7 * 60),
+                 ("chase", 20 * 60), ("scatter", 5 * 60), ("chase", None)]
+
+def ghost_mode(frame):
+    """Return the ghost mode for the given frame number of a game."""
+    for mode, duration in MODE_SCHEDULE:
+        if duration is None or frame < duration:
+            return mode
+        frame -= duration
 
 # -------------------------------
 # Drawing Functions for Retro Look
 # -------------------------------
 
+class Camera:
+    """
+    The part of the maze on screen. Actors keep maze pixel coordinates;
+    subtracting (x, y) gives screen coordinates. Mazes that fit on the screen
+    never scroll, larger ones re-center on Pac‑Man as he nears an edge.
+    """
+
+    def __init__(self):
+        self.col = 0
+        self.row = 0
+        self.x = 0
+        self.y = 0
+
+    def follow(self, row, col):
+        """Re-center on cell (row, col) if it is near the edge of the view; return True if the view moved."""
+        moved = False
+        if COLS > VIEW_COLS and not self.col + VIEW_MARGIN <= col < self.col + VIEW_COLS - VIEW_MARGIN:
+            self.col = min(max(col - VIEW_COLS // 2, 0), COLS - VIEW_COLS)
+            moved = True
+        if ROWS > VIEW_ROWS and not self.row + VIEW_MARGIN <= row < self.row + VIEW_ROWS - VIEW_MARGIN:
+            self.row = min(max(row - VIEW_ROWS // 2, 0), ROWS - VIEW_ROWS)
+            moved = True
+        self.x = self.col * BLOCK_SIZE
+        self.y = self.row * BLOCK_SIZE
+        return moved
+
+    def visible_cells(self):
+        """Return the row and column ranges of the cells (partly) on screen."""
+        return (range(self.row, min(ROWS, self.row + VIEW_ROWS + 1)),
+                range(self.col, min(COLS, self.col + VIEW_COLS + 1)))
+
+camera = Camera()
+
+def cell_rect(row, col):
+    """Return the screen rectangle covered by cell (row, col)."""
+    return pygame.Rect(TOP_LEFT_X + col * BLOCK_SIZE - camera.x, TOP_LEFT_Y + row * BLOCK_SIZE - camera.y,
+                       BLOCK_SIZE, BLOCK_SIZE)
+
+def actor_rect(actor):
+    """Return a screen rectangle that contains everything actor.draw() paints."""
+    size = 2 * actor.radius + 4
+    return pygame.Rect(int(actor.x - camera.x) - actor.radius - 2,
+                       int(actor.y - camera.y) - actor.radius - 2, size, size)
+
+def build_background(dots):
+    """
+    Render the walls and dots on screen to a screen-sized surface. This is
+    done when a level starts and when the camera moves; frames are drawn by
+    copying parts of it back to the screen.
+    """
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    background.fill(BLACK)
+    rows, cols = camera.visible_cells()
+    for r in rows:
+        line = maze[r]
+        for c in cols:
+            if line[c] == '#':
+                pygame.draw.rect(background, WALL_COLOR, cell_rect(r, c))
+            elif (r, c) in dots:
+                pygame.draw.circle(background, DOT_COLOR, cell_rect(r, c).center, DOT_RADIUS)
+    return background
+
+def erase_dot(background, row, col):
+    """
+    Remove an eaten dot from the background and return the area that
+    changed, or None if the cell is off screen.
+    """
+    rect = cell_rect(row, col)
+    if not background.get_rect().colliderect(rect):
+        return None
+    background.fill(BLACK, rect)
+    return rect
+
+class ScoreLabel:
+    """The score text, rendered again only when the score changes."""
+
+    def __init__(self, position=(10, 10)):
+        self.font = pygame.font.SysFont(None, 36)
+        self.position = position
+        self.score = None
+        self.rect = pygame.Rect(position, (0, 0))
+
+    def draw(self, surface, background, score, force=False):
+        """
+        Draw the score if it changed, or if force is set because something
+        was drawn over it; return the rectangles that need updating.
+        """
+        if score == self.score and not force:
+            return []
+        old_rect = self.rect
+        surface.blit(background, old_rect, old_rect)
+        text = self.font.render("Score: " + str(score), True, (255, 255, 255))
+        self.rect = surface.blit(text, self.position)
+        self.score = score
+        return [old_rect, self.rect]
+
 def draw_ghost(surface, x, y, r, color):
     """
     Draw a ghost at pixel (x, y) (its center) with "radius" r.
@@ -104,46 +634,109 @@ def draw_ghost(surface, x, y, r, color):
     pygame.draw.circle(surface, (0, 0, 0), left_eye_center, pupil_radius)
     pygame.draw.circle(surface, (0, 0, 0), right_eye_center, pupil_radius)
 
+# -------------------------------
+# Tile Motion
+# -------------------------------
+
+# Actors move in integer fixed point: SUBPIXELS units per pixel.
+SUBPIXELS = 16
+CELL_UNITS = BLOCK_SIZE * SUBPIXELS
+DIRECTION_INDEX = {direction: d for d, direction in enumerate(DIRECTIONS)}
+
+class TileMotion:
+    """
+    Movement along the maze grid in integer fixed point, shared by Pac‑Man
+    and the ghosts. The actor is 'offset' units (0 <= offset < CELL_UNITS)
+    from the center of cell (row, col) towards its neighbour in
+    DIRECTIONS[dir]; dir is None while it stands still. Speeds are whole
+    units per frame and a move never skips a cell center, so actors arrive
+    on every center exactly and the same inputs always give the same run.
+    """
+    __slots__ = ('row', 'col', 'dir', 'offset', 'speed')
+
+    def __init__(self, row, col, speed):
+        self.row = row
+        self.col = col
+        self.dir = None
+        self.offset = 0
+        self.speed = speed  # Units per frame
+
+    def advance(self, turn):
+        """
+        Move one frame. turn(motion) is called on every cell center the
+        actor is on or reaches and sets dir for the next cell (None stops).
+        """
+        budget = self.speed
+        while budget:
+            if self.offset == 0:
+                turn(self)
+                if self.dir is None:
+                    return
+            step = min(budget, CELL_UNITS - self.offset)
+            self.offset += step
+            budget -= step
+            if self.offset == CELL_UNITS:
+                dx, dy = DIRECTIONS[self.dir]
+                self.row += dy
+                self.col += dx
+                self.offset = 0
+
+    def cell(self):
+        """Return the cell that contains the actor's center."""
+        if self.offset * 2 < CELL_UNITS:
+            return self.row, self.col
+        dx, dy = DIRECTIONS[self.dir]
+        return self.row + dy, self.col + dx
+
+    def position(self):
+        """Return the actor's center in units from the maze's top left corner."""
+        x = self.col * CELL_UNITS + CELL_UNITS // 2
+        y = self.row * CELL_UNITS + CELL_UNITS // 2
+        if self.offset:
+            dx, dy = DIRECTIONS[self.dir]
+            x += dx * self.offset
+            y += dy * self.offset
+        return x, y
+
+    def touches(self, other, distance):
+        """Return True if the centers of two actors are less than 'distance' pixels apart."""
+        x, y = self.position()
+        other_x, other_y = other.position()
+        reach = distance * SUBPIXELS
+        return (x - other_x) ** 2 + (y - other_y) ** 2 < reach * reach
+
 # -------------------------------
 # Pac‑Man Class
 # -------------------------------
 
 class Pacman:
-    def __init__(self, x, y):
-        self.x = x  # Pixel x-coordinate (center)
-        self.y = y  # Pixel y-coordinate (center)
-        self.dir = (0, 0)          # Current movement direction (grid vector: (dx, dy))
+    def __init__(self, row, col):
+        self.motion = TileMotion(row, col, 3 * SUBPIXELS)  # 3 pixels per frame
+        self.dir = (0, 0)          # Current (or last) movement direction (grid vector: (dx, dy))
         self.desired_dir = (0, 0)  # Latest requested direction (from keyboard)
-        self.speed = 3.0           # Movement speed (pixels per frame)
         self.radius = BLOCK_SIZE // 2 - 2
 
-    def update(self):
-        # Determine current cell.
-        col = int((self.x - TOP_LEFT_X) // BLOCK_SIZE)
-        row = int((self.y - TOP_LEFT_Y) // BLOCK_SIZE)
-        # Compute cell center.
-        cell_center_x = TOP_LEFT_X + (col + 0.5) * BLOCK_SIZE
-        cell_center_y = TOP_LEFT_Y + (row + 0.5) * BLOCK_SIZE
-
-        # When nearly centered, try to update direction.
-        if abs(self.x - cell_center_x) < 3 and abs(self.y - cell_center_y) < 3:
-            if can_move(row, col, self.desired_dir):
-                self.dir = self.desired_dir
-
-        # Calculate new position.
-        new_x = self.x + self.dir[0] * self.speed
-        new_y = self.y + self.dir[1] * self.speed
-
-        # Check if the new cell is open.
-        new_col = int((new_x - TOP_LEFT_X) // BLOCK_SIZE)
-        new_row = int((new_y - TOP_LEFT_Y) // BLOCK_SIZE)
-        if maze[new_row][new_col] != '#':
-            self.x = new_x
-            self.y = new_y
+    # Pixel coordinates of the center, for drawing.
+    @property
+    def x(self):
+        return TOP_LEFT_X + self.motion.position()[0] / SUBPIXELS
+
+    @property
+    def y(self):
+        return TOP_LEFT_Y + self.motion.position()[1] / SUBPIXELS
+
+    def turn(self, motion):
+        # At a cell center: take the requested direction if it is open, and
+        # stop if the way ahead is a wall.
+        if can_move(motion.row, motion.col, self.desired_dir):
+            self.dir = self.desired_dir
+        if self.dir != (0, 0) and can_move(motion.row, motion.col, self.dir):
+            motion.dir = DIRECTION_INDEX[self.dir]
         else:
-            # If blocked, snap to the cell center.
-            self.x = cell_center_x
-            self.y = cell_center_y
+            motion.dir = None
+
+    def update(self):
+        self.motion.advance(self.turn)
 
     def draw(self, surface):
         # Draw Pac‑Man as a yellow circle with a black wedge for an open mouth.
@@ -153,53 +746,208 @@ class Pacman:
             angle = math.atan2(-self.dir[1], self.dir[0])
         else:
             angle = 0  # Default facing right
+        x = self.x - camera.x  # Screen position
+        y = self.y - camera.y
         # Draw outer black circle (outline)
-        pygame.draw.circle(surface, (0, 0, 0), (int(self.x), int(self.y)), self.radius)
+        pygame.draw.circle(surface, (0, 0, 0), (int(x), int(y)), self.radius)
         # Draw inner yellow circle
-        pygame.draw.circle(surface, (255, 255, 0), (int(self.x), int(self.y)), self.radius - 2)
+        pygame.draw.circle(surface, (255, 255, 0), (int(x), int(y)), self.radius - 2)
         # Draw mouth wedge (black polygon)
-        point1 = (self.x + self.radius * math.cos(angle + mouth_angle),
-                  self.y - self.radius * math.sin(angle + mouth_angle))
-        point2 = (self.x + self.radius * math.cos(angle - mouth_angle),
-                  self.y - self.radius * math.sin(angle - mouth_angle))
-        pygame.draw.polygon(surface, (0, 0, 0), [(self.x, self.y), point1, point2])
+        point1 = (x + self.radius * math.cos(angle + mouth_angle),
+                  y - self.radius * math.sin(angle + mouth_angle))
+        point2 = (x + self.radius * math.cos(angle - mouth_angle),
+                  y - self.radius * math.sin(angle - mouth_angle))
+        pygame.draw.polygon(surface, (0, 0, 0), [(x, y), point1, point2])
 
 # -------------------------------
 # Ghost Class
 # -------------------------------
 
 class Ghost:
-    def __init__(self, x, y, color):
-        self.x = x  # Pixel x-coordinate (center)
-        self.y = y  # Pixel y-coordinate (center)
-        self.dir = random.choice([(1,0), (-1,0), (0,1), (0,-1)])
-        self.speed = 2.5
+    def __init__(self, row, col, color, home, lead=0):
+        self.motion = TileMotion(row, col, 5 * SUBPIXELS // 2)  # 2.5 pixels per frame
+        self.dir = random.choice(DIRECTIONS)
         self.radius = BLOCK_SIZE // 2 - 2
         self.color = color
+        self.home = home  # Cell targeted in scatter mode
+        self.lead = lead  # Cells ahead of Pac‑Man targeted in chase mode
+        self.goal = None  # Cell targeted this frame
+        # The straight runs left to the next junction, as [direction index,
+        # cells]; empty when the ghost is on a junction and must decide.
+        self.runs = []
 
-    def update(self):
-        # Determine current cell.
-        col = int((self.x - TOP_LEFT_X) // BLOCK_SIZE)
-        row = int((self.y - TOP_LEFT_Y) // BLOCK_SIZE)
-        cell_center_x = TOP_LEFT_X + (col + 0.5) * BLOCK_SIZE
-        cell_center_y = TOP_LEFT_Y + (row + 0.5) * BLOCK_SIZE
-
-        # At intersections (nearly centered), choose a new direction (but don’t reverse).
-        if abs(self.x - cell_center_x) < 3 and abs(self.y - cell_center_y) < 3:
-            possible_dirs = []
-            for d in [(1,0), (-1,0), (0,1), (0,-1)]:
-                if (d[0] == -self.dir[0] and d[1] == -self.dir[1]):
-                    continue
-                if can_move(row, col, d):
-                    possible_dirs.append(d)
-            if possible_dirs:
-                self.dir = random.choice(possible_dirs)
-
-        self.x += self.dir[0] * self.speed
-        self.y += self.dir[1] * self.speed
+    # Pixel coordinates of the center, for drawing.
+    @property
+    def x(self):
+        return TOP_LEFT_X + self.motion.position()[0] / SUBPIXELS
+
+    @property
+    def y(self):
+        return TOP_LEFT_Y + self.motion.position()[1] / SUBPIXELS
+
+    def target(self, pacman_cell, pacman_dir, mode):
+        """Return the cell this ghost heads for."""
+        if mode == "scatter":
+            return self.home
+        return cell_ahead(pacman_cell[0], pacman_cell[1], pacman_dir, self.lead)
+
+    def choose_direction(self, cell, target):
+        """
+        Return the index of the direction that starts a shortest path from
+        cell to target, without reversing unless the ghost is in a dead end.
+        """
+        reverse = DIRECTIONS.index((-self.dir[0], -self.dir[1]))
+        if paths is not None:
+            here = paths.index[cell]
+            goal = paths.index[target]
+            best = paths.next_dir[here, goal]
+            if best >= 0 and best != reverse:
+                return best
+            distance = lambda d: paths.dist[paths.neighbors[here, d], goal]
+        else:
+            distance = lambda d: local_paths.distance(
+                (cell[0] + DIRECTIONS[d][1], cell[1] + DIRECTIONS[d][0]), target)
+        # The shortest path turns back (or the ghost is on the target, or
+        # there is no path table): take the forward exit closest to the target.
+        mask = exits[cell[0] * COLS + cell[1]]
+        options = [d for d in range(len(DIRECTIONS)) if mask & (1 << d) and d != reverse]
+        if not options:
+            return reverse
+        return min(options, key=distance)
+
+    def turn(self, motion):
+        # Decide only on a junction, then follow the corridor to the next one
+        # without looking at the maze again.
+        if not self.runs:
+            cell = (motion.row, motion.col)
+            d = self.choose_direction(cell, self.goal)
+            self.runs = [[d, length] for d, length in graph.route(cell, d)[1]]
+        run = self.runs[0]
+        motion.dir = run[0]
+        self.dir = DIRECTIONS[run[0]]
+        run[1] -= 1
+        if run[1] == 0:
+            self.runs.pop(0)
+
+    def update(self, target):
+        self.goal = target
+        self.motion.advance(self.turn)
+
+    def draw(self, surface):
+        draw_ghost(surface, int(self.x - camera.x), int(self.y - camera.y), self.radius, self.color)
+
+# -------------------------------
+# Ghost Swarm
+# -------------------------------
+
+# ALLOWED[mask, d, e] is True if a ghost that reached a cell with exit mask
+# 'mask' moving in DIRECTIONS[d] may leave it in DIRECTIONS[e]: by any exit
+# but the way back, or only back out of a dead end.
+ALLOWED = np.zeros((16, len(DIRECTIONS), len(DIRECTIONS)), dtype=bool)
+for mask in range(16):
+    for d in range(len(DIRECTIONS)):
+        open_exits = [e for e in range(len(DIRECTIONS)) if mask & (1 << e)]
+        forward = [e for e in open_exits if e != OPPOSITE[d]]
+        ALLOWED[mask, d, forward or open_exits] = True
+DIRECTION_DX = np.array([dx for dx, dy in DIRECTIONS])
+DIRECTION_DY = np.array([dy for dx, dy in DIRECTIONS])
+SWARM_SPAWN_DISTANCE = 6  # minimum cells between a swarm ghost and Pac‑Man at the start
+SPRITE_COLORKEY = (255, 0, 255)
+
+def ghost_sprite(color, radius):
+    """Pre-render a ghost to a surface the size of its actor_rect()."""
+    size = 2 * radius + 4
+    sprite = pygame.Surface((size, size)).convert()
+    sprite.fill(SPRITE_COLORKEY)
+    sprite.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+    draw_ghost(sprite, radius + 2, radius + 2, radius, color)
+    return sprite
+
+class GhostSwarm:
+    """
+    Any number of extra ghosts, stored as NumPy arrays and moved, steered,
+    collision-tested and drawn in bulk. Each ghost walks from cell center to
+    cell center at its own speed. On arriving, ALLOWED gives its exits;
+    chasers take the one that brings them closest to Pac‑Man in a straight
+    line (the arcade rule), the others one at random.
+    """
+
+    def __init__(self, count, chase_fraction=0.25, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.exit_masks = np.frombuffer(bytes(exits), dtype=np.uint8)
+        self.steps = DIRECTION_DX + DIRECTION_DY * COLS  # cell number offsets
+        open_cells = np.flatnonzero(self.exit_masks)
+        row, col = np.divmod(open_cells, COLS)
+        far = (np.abs(row - PACMAN_START[0]) + np.abs(col - PACMAN_START[1])) >= SWARM_SPAWN_DISTANCE
+        if far.any():
+            open_cells = open_cells[far]
+        # The same fixed point motion as TileMotion. cell: the cell each
+        # ghost is heading for; remaining: units left to its center; x, y:
+        # units from the maze's top left corner. Ghosts start on a center
+        # and decide first thing.
+        self.cell = self.rng.choice(open_cells, count)
+        row, col = np.divmod(self.cell, COLS)
+        self.x = col * CELL_UNITS + CELL_UNITS // 2
+        self.y = row * CELL_UNITS + CELL_UNITS // 2
+        self.dir = self.rng.integers(0, len(DIRECTIONS), count)
+        self.speed = self.rng.integers(3 * SUBPIXELS // 2, 5 * SUBPIXELS // 2 + 1, count)  # 1.5 to 2.5 pixels
+        self.remaining = np.zeros(count, dtype=np.int64)
+        self.chaser = self.rng.random(count) < chase_fraction
+        self.radius = BLOCK_SIZE // 2 - 2
+        colors = [color for color, lead, corner in GHOST_TYPES.values()]
+        self.sprites = [ghost_sprite(color, self.radius) for color in colors]
+        self.kind = np.arange(count) % len(colors)
+
+    def __len__(self):
+        return len(self.cell)
+
+    def decide(self, ghosts, pacman_cell):
+        """Pick the next direction of the given ghosts, which are on a cell center."""
+        cell = self.cell[ghosts]
+        allowed = ALLOWED[self.exit_masks[cell], self.dir[ghosts]]
+        score = self.rng.random(allowed.shape)
+        chasers = self.chaser[ghosts]
+        if chasers.any():
+            row, col = np.divmod(cell[chasers], COLS)
+            dr = row[:, None] + DIRECTION_DY - pacman_cell[0]
+            dc = col[:, None] + DIRECTION_DX - pacman_cell[1]
+            score[chasers] = dr * dr + dc * dc
+        score[~allowed] = np.inf
+        d = score.argmin(axis=1)
+        self.dir[ghosts] = d
+        self.cell[ghosts] = cell + self.steps[d]
+        self.remaining[ghosts] = CELL_UNITS
+
+    def update(self, pacman_cell):
+        arrived = np.flatnonzero(self.remaining <= 0)
+        if len(arrived):
+            self.decide(arrived, pacman_cell)
+        # Never overshoot a center, so every ghost arrives on it exactly.
+        step = np.minimum(self.speed, self.remaining)
+        self.x += DIRECTION_DX[self.dir] * step
+        self.y += DIRECTION_DY[self.dir] * step
+        self.remaining -= step
+
+    def hits(self, pacman):
+        """Return True if any ghost touches Pac‑Man."""
+        x, y = pacman.motion.position()
+        dx = self.x - x
+        dy = self.y - y
+        reach = (pacman.radius + self.radius) * SUBPIXELS
+        return bool(np.any(dx * dx + dy * dy < reach * reach))
 
     def draw(self, surface):
-        draw_ghost(surface, int(self.x), int(self.y), self.radius, self.color)
+        """Blit the ghosts that are on screen in one call; return their screen rectangles."""
+        size = 2 * self.radius + 4
+        left = TOP_LEFT_X + self.x // SUBPIXELS - camera.x - self.radius - 2
+        top = TOP_LEFT_Y + self.y // SUBPIXELS - camera.y - self.radius - 2
+        width, height = surface.get_size()
+        shown = np.flatnonzero((left < width) & (left + size > 0) & (top < height) & (top + size > 0))
+        left, top = left[shown].tolist(), top[shown].tolist()
+        sprites = self.sprites
+        surface.blits([(sprites[kind], (x, y)) for kind, x, y in zip(self.kind[shown].tolist(), left, top)],
+                      doreturn=False)
+        return [pygame.Rect(x, y, size, size) for x, y in zip(left, top)]
 
 # -------------------------------
 # Screen Functions: Start & Restart
@@ -255,29 +1003,39 @@ def show_restart_screen(result):
 # Main Game Loop Function
 # -------------------------------
 
-def run_game():
+def run_game(swarm_size=0, chase_fraction=0.25):
+    """
+    Play the current level once and return "win" or "loss". swarm_size adds
+    that many GhostSwarm ghosts, chase_fraction of which chase Pac‑Man.
+    """
     # Initialize dots, Pac‑Man, and ghosts.
     dots = create_dots()
-    # Start Pac‑Man at cell (5,2)
-    pac_start_row, pac_start_col = 5, 2
-    pacman = Pacman(TOP_LEFT_X + (pac_start_col + 0.5) * BLOCK_SIZE,
-                    TOP_LEFT_Y + (pac_start_row + 0.5) * BLOCK_SIZE)
-    if (pac_start_row, pac_start_col) in dots:
-        dots.discard((pac_start_row, pac_start_col))
-        
-    # Create two ghosts at fixed locations.
+    pac_start_row, pac_start_col = PACMAN_START
+    pacman = Pacman(pac_start_row, pac_start_col)
+
+    # Create the level's ghosts at their start cells.
     ghosts = []
-    ghost1_row, ghost1_col = 5, 18
-    ghost2_row, ghost2_col = 3, 10
-    ghosts.append(Ghost(TOP_LEFT_X + (ghost1_col + 0.5) * BLOCK_SIZE,
-                        TOP_LEFT_Y + (ghost1_row + 0.5) * BLOCK_SIZE, (255, 0, 0)))       # Red ghost
-    ghosts.append(Ghost(TOP_LEFT_X + (ghost2_col + 0.5) * BLOCK_SIZE,
-                        TOP_LEFT_Y + (ghost2_row + 0.5) * BLOCK_SIZE, (255, 184, 255)))   # Pink ghost
-    # Remove dots where ghosts start.
-    dots.discard((ghost1_row, ghost1_col))
-    dots.discard((ghost2_row, ghost2_col))
-    
+    for digit, (row, col) in GHOST_STARTS:
+        color, lead, (corner_row, corner_col) = GHOST_TYPES[digit]
+        home = nearest_open_cell(corner_row * (ROWS - 1), corner_col * (COLS - 1))
+        ghosts.append(Ghost(row, col, color, home, lead))
+    # All randomness comes from the random module, so seeding it makes a
+    # game with the same inputs replay exactly.
+    swarm = GhostSwarm(swarm_size, chase_fraction, random.getrandbits(32)) if swarm_size else None
+
+    # Walls and dots are drawn once (and again when the view scrolls); each
+    # frame only the actors move.
+    global camera
+    camera = Camera()
+    camera.follow(pac_start_row, pac_start_col)
+    background = build_background(dots)
+    score_label = ScoreLabel()
+    screen.blit(background, (0, 0))
+    dirty = [screen.get_rect()]
+    actor_rects = []
+
     score = 0
+    frame = 0
     running = True
     win = False
 
@@ -297,23 +1055,33 @@ def run_game():
                     pacman.desired_dir = (1, 0)
 
         pacman.update()
+        pac_row, pac_col = pacman.motion.cell()
+        if local_paths is not None:
+            local_paths.update((pac_row, pac_col))
+        mode = ghost_mode(frame)
         for ghost in ghosts:
-            ghost.update()
+            ghost.update(ghost.target((pac_row, pac_col), pacman.dir, mode))
+        if swarm:
+            swarm.update((pac_row, pac_col))
+        frame += 1
 
         # Check if Pac‑Man collects a dot.
-        pac_row = int((pacman.y - TOP_LEFT_Y) // BLOCK_SIZE)
-        pac_col = int((pacman.x - TOP_LEFT_X) // BLOCK_SIZE)
         if (pac_row, pac_col) in dots:
             dots.discard((pac_row, pac_col))
+            rect = erase_dot(background, pac_row, pac_col)
+            if rect:
+                dirty.append(rect)
             score += 10
 
         # Check collision between Pac‑Man and ghosts.
         for ghost in ghosts:
-            distance = math.hypot(pacman.x - ghost.x, pacman.y - ghost.y)
-            if distance < pacman.radius + ghost.radius:
+            if pacman.motion.touches(ghost.motion, pacman.radius + ghost.radius):
                 running = False
                 win = False
                 break
+        if swarm and swarm.hits(pacman):
+            running = False
+            win = False
 
         # Win condition: all dots eaten.
         if not dots:
@@ -323,31 +1091,33 @@ def run_game():
         # -------------
         # Drawing Code
         # -------------
-        screen.fill((0, 0, 0))
-        # Draw maze walls.
-        for r in range(ROWS):
-            for c in range(COLS):
-                if maze[r][c] == '#':
-                    rect = pygame.Rect(TOP_LEFT_X + c * BLOCK_SIZE,
-                                       TOP_LEFT_Y + r * BLOCK_SIZE,
-                                       BLOCK_SIZE, BLOCK_SIZE)
-                    pygame.draw.rect(screen, (0, 0, 255), rect)
-        # Draw dots.
-        for (r, c) in dots:
-            center = (int(TOP_LEFT_X + c * BLOCK_SIZE + BLOCK_SIZE / 2),
-                      int(TOP_LEFT_Y + r * BLOCK_SIZE + BLOCK_SIZE / 2))
-            pygame.draw.circle(screen, (255, 255, 255), center, 3)
+        # Scrolling repaints the whole view.
+        if camera.follow(pac_row, pac_col):
+            background = build_background(dots)
+            actor_rects = []
+            dirty = [screen.get_rect()]
+        # Restore the background where the actors were last frame and where
+        # a dot was eaten, then draw the actors at their new positions.
+        screen.blits([(background, rect, rect) for rect in actor_rects + dirty], doreturn=False)
+        dirty.extend(actor_rects)
         # Draw Pac‑Man.
+        actor_rects = [actor_rect(pacman)]
         pacman.draw(screen)
-        # Draw ghosts.
+        # Draw the ghosts on screen.
+        view = screen.get_rect()
         for ghost in ghosts:
-            ghost.draw(screen)
-        # Draw the score.
-        font = pygame.font.SysFont(None, 36)
-        score_text = font.render("Score: " + str(score), True, (255, 255, 255))
-        screen.blit(score_text, (10, 10))
-        
-        pygame.display.flip()
+            rect = actor_rect(ghost)
+            if view.colliderect(rect):
+                actor_rects.append(rect)
+                ghost.draw(screen)
+        if swarm:
+            actor_rects.extend(swarm.draw(screen))
+        # Draw the score, again if it was painted over.
+        covered = score_label.rect.collidelist(dirty + actor_rects) >= 0
+        dirty.extend(score_label.draw(screen, background, score, force=covered))
+
+        pygame.display.update(dirty + actor_rects)
+        dirty = []
         clock.tick(60)
         
     return "win" if win else "loss"
@@ -356,14 +1126,55 @@ def run_game():
 # Main Program Loop
 # -------------------------------
 
-def main():
+def main(levels, swarm_size=0, chase_fraction=0.25):
+    """Play the given levels (as for load_level()) in order; after a loss the level restarts."""
     show_start_screen()
-    restart = True
-    while restart:
-        result = run_game()  # Run one game session.
-        restart = show_restart_screen(result)
+    level = 0
+    loaded = None
+    while True:
+        # The path table and corridor graph do not change during a game, so
+        # restarting the same level keeps them.
+        if level != loaded:
+            load_level(levels[level])
+            loaded = level
+        result = run_game(swarm_size, chase_fraction)  # Run one game session.
+        if result == "win" and level + 1 < len(levels):
+            level += 1
+            continue
+        if not show_restart_screen(result):
+            break
+        if result == "win":
+            level = 0
     pygame.quit()
     sys.exit()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pac‑Man")
+    parser.add_argument("levels", nargs="*",
+                        help="level files to play in order (default: every level in %s)" % LEVEL_DIR)
+    parser.add_argument("--random", nargs=2, type=int, metavar=("COLS", "ROWS"),
+                        help="play a generated maze of this size (%d to %d cells per side)"
+                             % (MIN_MAZE_SIZE, MAX_MAZE_SIZE))
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for --random and the ghosts; the same seed and inputs replay a game exactly")
+    parser.add_argument("--swarm", type=int, default=0, metavar="N",
+                        help="add N ghosts moved in bulk (swarm mode)")
+    parser.add_argument("--chase", type=float, default=0.25, metavar="FRACTION",
+                        help="share of swarm ghosts that chase Pac‑Man (default 0.25)")
+    args = parser.parse_args()
+    random.seed(args.seed)
+    if args.swarm < 0 or not 0 <= args.chase <= 1:
+        parser.error("--swarm must not be negative and --chase must be between 0 and 1")
+    levels = args.levels or level_files()
+    if args.random:
+        try:
+            levels = [generate_maze(args.random[0], args.random[1], args.seed)]
+        except ValueError as error:
+            parser.error(str(error))
+    # Check every level before the game starts, keeping the compiled result
+    # so main() does not read and check it again.
+    try:
+        levels = [compile_level(level) for level in levels]
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    main(levels, args.swarm, args.chase)
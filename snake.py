@@ -1,16 +1,27 @@
 import pygame
 import sys
 import random
+import argparse
+from array import array
+from collections import deque
+import numpy as np
 
 # Initialize Pygame
 pygame.init()
 
 # Game constants
 CELL_SIZE = 20
-COLS = 30
+COLS = 30  # board size in cells, see configure()
 ROWS = 20
-WIDTH = CELL_SIZE * COLS  # 600 pixels
-HEIGHT = CELL_SIZE * ROWS  # 400 pixels
+MAX_BOARD_SIZE = 2000  # largest number of columns or rows
+VIEW_COLS = 30  # cells shown in the window; larger boards scroll
+VIEW_ROWS = 20
+VIEW_MARGIN = 5  # re-center the view when the head gets this close to an edge
+WIDTH = CELL_SIZE * VIEW_COLS  # 600 pixels
+HEIGHT = CELL_SIZE * VIEW_ROWS  # 400 pixels
+
+# Cell contents of the board bytearray and SnakeVecEnv observations.
+EMPTY, BODY, FOOD, HEAD = 0, 1, 2, 3
 
 # Colors (R, G, B)
 BLACK = (0, 0, 0)
@@ -19,29 +30,259 @@ GREEN = (0, 255, 0)
 RED   = (255, 0, 0)
 BLUE  = (50, 153, 213)
 
-# Set up display
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Snake Game")
-
 clock = pygame.time.Clock()
 SNAKE_SPEED = 10  # Frames per second
 
+# Colors used to draw each kind of board cell.
+CELL_COLORS = {EMPTY: BLUE, BODY: WHITE, FOOD: GREEN, HEAD: WHITE}
+
+# Set the board size. The window shows at most VIEW_COLS x VIEW_ROWS cells
+# and scrolls to follow the snake on larger boards.
+def configure(cols, rows):
+    global COLS, ROWS, VIEW_COLS, VIEW_ROWS, WIDTH, HEIGHT
+    if not (1 < cols <= MAX_BOARD_SIZE and 1 < rows <= MAX_BOARD_SIZE):
+        raise ValueError("board size must be between 2 and %d cells" % MAX_BOARD_SIZE)
+    COLS, ROWS = cols, rows
+    VIEW_COLS, VIEW_ROWS = min(cols, 30), min(rows, 20)
+    WIDTH, HEIGHT = CELL_SIZE * VIEW_COLS, CELL_SIZE * VIEW_ROWS
+
+# Cells are numbered row by row: cell = row * COLS + col.
+# The camera shows the VIEW_COLS x VIEW_ROWS cells starting at (col, row),
+# wrapping around the board edges like the snake does.
+class Camera:
+    def __init__(self):
+        self.col = 0
+        self.row = 0
+
+    # Screen position of a board cell, or None when it is off screen.
+    def screen_position(self, cell):
+        col = (cell % COLS - self.col) % COLS
+        row = (cell // COLS - self.row) % ROWS
+        if col >= VIEW_COLS or row >= VIEW_ROWS:
+            return None
+        return col * CELL_SIZE, row * CELL_SIZE
+
+    # Board cell shown at a screen cell.
+    def cell_at(self, view_col, view_row):
+        return ((self.row + view_row) % ROWS) * COLS + (self.col + view_col) % COLS
+
+    # Re-center on the cell when it gets within VIEW_MARGIN of the edge of
+    # the view. Returns True if the camera moved.
+    def follow(self, cell):
+        moved = False
+        col = (cell % COLS - self.col) % COLS
+        margin = min(VIEW_MARGIN, VIEW_COLS // 4)
+        if COLS > VIEW_COLS and not margin <= col < VIEW_COLS - margin:
+            self.col = (cell % COLS - VIEW_COLS // 2) % COLS
+            moved = True
+        row = (cell // COLS - self.row) % ROWS
+        margin = min(VIEW_MARGIN, VIEW_ROWS // 4)
+        if ROWS > VIEW_ROWS and not margin <= row < VIEW_ROWS - margin:
+            self.row = (cell // COLS - VIEW_ROWS // 2) % ROWS
+            moved = True
+        return moved
+
+# Paint one cell if it is on screen and return the rect that needs
+# updating on the display, or None.
+def draw_cell(camera, cell, color):
+    position = camera.screen_position(cell)
+    if position is None:
+        return None
+    return pygame.draw.rect(screen, color, [position[0], position[1], CELL_SIZE, CELL_SIZE])
+
+# Repaint the screen cells under rect from the board, e.g. before redrawing
+# the score text that sits on top of it. Only visible cells are touched, so
+# the cost does not depend on the board size.
+def repaint_cells(camera, board, rect):
+    for row in range(rect.top // CELL_SIZE, min(rect.bottom - 1, HEIGHT - 1) // CELL_SIZE + 1):
+        for col in range(rect.left // CELL_SIZE, min(rect.right - 1, WIDTH - 1) // CELL_SIZE + 1):
+            color = CELL_COLORS[board[camera.cell_at(col, row)]]
+            pygame.draw.rect(screen, color, [col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE])
+
+# Index of the unoccupied cells: an array of free cells plus each cell's
+# position in that array (-1 when occupied). Removing swaps the cell with
+# the last entry, so occupying, freeing and picking a random free cell are
+# all O(1) no matter how full the board is. Both arrays are packed ints.
+class FreeCells:
+    def __init__(self, count):
+        self.cells = array('i', range(count))
+        self.position = array('i', range(count))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def is_free(self, cell):
+        return self.position[cell] >= 0
+
+    def occupy(self, cell):
+        index = self.position[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[index] = last
+            self.position[last] = index
+        self.position[cell] = -1
+
+    def release(self, cell):
+        self.position[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def choice(self):
+        return self.cells[random.randrange(len(self.cells))]
+
+# -----------------------------
+# Headless vectorized environment
+# -----------------------------
+# Actions are absolute directions; a reversing action is ignored, like the
+# arrow keys in game_loop().
+UP, RIGHT, DOWN, LEFT = range(4)
+DIRECTION_ROWS = np.array([-1, 0, 1, 0])
+DIRECTION_COLS = np.array([0, 1, 0, -1])
+
+# N independent snake games with the rules of game_loop() (wrapping edges,
+# growth on food, death on self-collision) stepped in lockstep with NumPy.
+# Bodies are ring buffers of cell numbers, boards are occupancy grids and
+# every game keeps a FreeCells-style index for O(1) food placement.
+# Finished games are reset automatically.
+class SnakeVecEnv:
+    def __init__(self, num_envs, cols=COLS, rows=ROWS, seed=None):
+        self.num_envs = num_envs
+        self.cols = cols
+        self.rows = rows
+        self.num_cells = cols * rows
+        self.rng = np.random.default_rng(seed)
+        n, cells = num_envs, self.num_cells
+        self.grid = np.zeros((n, cells), dtype=np.int8)
+        self.body = np.zeros((n, cells), dtype=np.int32)  # ring buffers
+        self.tail = np.zeros(n, dtype=np.int64)  # ring index of the tail
+        self.size = np.zeros(n, dtype=np.int64)  # segments on the board
+        self.length = np.zeros(n, dtype=np.int64)  # segments the snake should have
+        self.head = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.food = np.zeros(n, dtype=np.int64)
+        self.free = np.zeros((n, cells), dtype=np.int32)
+        self.position = np.zeros((n, cells), dtype=np.int32)
+        self.num_free = np.zeros(n, dtype=np.int64)
+        self.all_envs = np.arange(n)
+        self.reset()
+
+    # Observations are (num_envs, rows, cols) views of the occupancy grids.
+    def observation(self):
+        return self.grid.reshape(self.num_envs, self.rows, self.cols)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.reset_envs(self.all_envs)
+        return self.observation()
+
+    # Start new games in the given environments: a one-cell snake in the
+    # middle of the board heading in a random direction, plus one food.
+    def reset_envs(self, envs):
+        center = (self.rows // 2) * self.cols + self.cols // 2
+        self.grid[envs] = EMPTY
+        self.free[envs] = np.arange(self.num_cells)
+        self.position[envs] = np.arange(self.num_cells)
+        self.num_free[envs] = self.num_cells
+        self.tail[envs] = 0
+        self.size[envs] = 1
+        self.length[envs] = 1
+        self.head[envs] = center
+        self.direction[envs] = self.rng.integers(4, size=len(envs))
+        self.body[envs, 0] = center
+        self.grid[envs, center] = HEAD
+        self.occupy(envs, self.head[envs])
+        self.spawn_food(envs)
+
+    # Swap-remove each env's cell from its free-cell index.
+    def occupy(self, envs, cells):
+        index = self.position[envs, cells]
+        last = self.free[envs, self.num_free[envs] - 1]
+        self.free[envs, index] = last
+        self.position[envs, last] = index
+        self.position[envs, cells] = -1
+        self.num_free[envs] -= 1
+
+    def release(self, envs, cells):
+        self.free[envs, self.num_free[envs]] = cells
+        self.position[envs, cells] = self.num_free[envs]
+        self.num_free[envs] += 1
+
+    def spawn_food(self, envs):
+        envs = envs[self.num_free[envs] > 0]
+        pick = (self.rng.random(len(envs)) * self.num_free[envs]).astype(np.int64)
+        self.food[envs] = self.free[envs, pick]
+        self.grid[envs, self.food[envs]] = FOOD
+
+    # Advance every game by one move. Returns (observation, reward, done):
+    # reward is +1 for eating, -1 for dying and 0 otherwise; done games have
+    # already been reset in the returned observation.
+    def step(self, actions):
+        envs = self.all_envs
+        actions = np.asarray(actions)
+        reverse = (actions + 2) % 4 == self.direction
+        self.direction = np.where(reverse, self.direction, actions)
+
+        # New head position with wrapping edges.
+        row, col = np.divmod(self.head, self.cols)
+        row = (row + DIRECTION_ROWS[self.direction]) % self.rows
+        col = (col + DIRECTION_COLS[self.direction]) % self.cols
+        new_head = row * self.cols + col
+        self.grid[envs, self.head] = BODY
+
+        # Free the tail first so the head may move into the cell it leaves.
+        moving = envs[self.size >= self.length]
+        tail_cells = self.body[moving, self.tail[moving]]
+        self.grid[moving, tail_cells] = EMPTY
+        self.release(moving, tail_cells)
+        self.tail[moving] = (self.tail[moving] + 1) % self.num_cells
+        self.size[moving] -= 1
+
+        target = self.grid[envs, new_head]
+        dead = (target == BODY) | (target == HEAD)
+        ate = target == FOOD
+
+        alive = envs[~dead]
+        cells = new_head[alive]
+        self.grid[alive, cells] = HEAD
+        self.occupy(alive, cells)
+        self.body[alive, (self.tail[alive] + self.size[alive]) % self.num_cells] = cells
+        self.size[alive] += 1
+        self.head = new_head
+        self.length += ate
+
+        # A snake that fills the whole board has won.
+        won = ate & (self.num_free == 0)
+        self.spawn_food(envs[ate & ~won])
+
+        reward = ate.astype(np.float32) - dead
+        done = dead | won
+        if done.any():
+            self.reset_envs(envs[done])
+        return self.observation(), reward, done
+
 def game_loop():
-    # Initial snake position (center of the screen)
-    snake_x = WIDTH // 2
-    snake_y = HEIGHT // 2
+    # Initial snake position (center of the board), in cells
+    snake_col = COLS // 2
+    snake_row = ROWS // 2
     x_change = 0
     y_change = 0
 
-    snake_list = []
+    # Segment cells from tail to head, the board contents as one byte per
+    # cell, and an index of the cells the snake does not occupy, so that
+    # moving, growing, self-collision checks and food placement are all O(1).
+    snake_body = deque()
+    board = bytearray(COLS * ROWS)
+    free_cells = FreeCells(COLS * ROWS)
     snake_length = 1
+    camera = Camera()
+    camera.follow(snake_row * COLS + snake_col)
 
     # Score counter
     score = 0
 
-    # Place the first food item at a random location
-    food_x = round(random.randrange(0, WIDTH - CELL_SIZE) / CELL_SIZE) * CELL_SIZE
-    food_y = round(random.randrange(0, HEIGHT - CELL_SIZE) / CELL_SIZE) * CELL_SIZE
+    # Place the first food item in a random free cell
+    food = free_cells.choice()
+    board[food] = FOOD
 
     # --- Start Screen ---
     start = True
@@ -59,22 +300,27 @@ def game_loop():
             if event.type == pygame.KEYDOWN:
                 # Set the initial direction based on the key pressed.
                 if event.key == pygame.K_LEFT:
-                    x_change = -CELL_SIZE
+                    x_change = -1
                     y_change = 0
                 elif event.key == pygame.K_RIGHT:
-                    x_change = CELL_SIZE
+                    x_change = 1
                     y_change = 0
                 elif event.key == pygame.K_UP:
-                    y_change = -CELL_SIZE
+                    y_change = -1
                     x_change = 0
                 elif event.key == pygame.K_DOWN:
-                    y_change = CELL_SIZE
+                    y_change = 1
                     x_change = 0
                 start = False
 
     # --- Main Game Loop ---
     game_over = False
+    won = False
     score_font = pygame.font.SysFont(None, 35)
+    score_rect = pygame.Rect(10, 10, 0, 0)
+    shown_score = None
+    redraw_view = True
+
     while not game_over:
         # Process events
         for event in pygame.event.get():
@@ -84,72 +330,94 @@ def game_loop():
             if event.type == pygame.KEYDOWN:
                 # Change direction, disallowing direct reversals.
                 if event.key == pygame.K_LEFT and x_change == 0:
-                    x_change = -CELL_SIZE
+                    x_change = -1
                     y_change = 0
                 elif event.key == pygame.K_RIGHT and x_change == 0:
-                    x_change = CELL_SIZE
+                    x_change = 1
                     y_change = 0
                 elif event.key == pygame.K_UP and y_change == 0:
-                    y_change = -CELL_SIZE
+                    y_change = -1
                     x_change = 0
                 elif event.key == pygame.K_DOWN and y_change == 0:
-                    y_change = CELL_SIZE
+                    y_change = 1
                     x_change = 0
 
-        # Update snake position
-        snake_x += x_change
-        snake_y += y_change
-
-        # --- Screen Wrapping ---
-        if snake_x < 0:
-            snake_x = WIDTH - CELL_SIZE
-        elif snake_x >= WIDTH:
-            snake_x = 0
-        if snake_y < 0:
-            snake_y = HEIGHT - CELL_SIZE
-        elif snake_y >= HEIGHT:
-            snake_y = 0
-
-        # Fill the screen with background color
-        screen.fill(BLUE)
+        # Update snake position, wrapping around the board edges
+        snake_col = (snake_col + x_change) % COLS
+        snake_row = (snake_row + y_change) % ROWS
 
-        # Draw the food
-        pygame.draw.rect(screen, GREEN, [food_x, food_y, CELL_SIZE, CELL_SIZE])
-
-        # Update the snake's segments
-        snake_head = [snake_x, snake_y]
-        snake_list.append(snake_head)
-        if len(snake_list) > snake_length:
-            del snake_list[0]
+        # Update the snake's segments, freeing the tail cell first so the
+        # head may move into the cell the tail just left.
+        snake_head = snake_row * COLS + snake_col
+        vacated = None
+        if len(snake_body) >= snake_length:
+            vacated = snake_body.popleft()
+            free_cells.release(vacated)
+            board[vacated] = EMPTY
 
         # Check for collision with itself
-        for segment in snake_list[:-1]:
-            if segment == snake_head:
+        if board[snake_head] == BODY:
+            game_over = True
+        else:
+            free_cells.occupy(snake_head)
+        snake_body.append(snake_head)
+
+        # Check if the snake has eaten the food
+        ate = snake_head == food and not game_over
+        board[snake_head] = BODY
+        if ate:
+            snake_length += 1
+            score += 1  # Increase score
+            if len(free_cells) == 0:
+                # The snake fills the whole board.
+                won = True
                 game_over = True
+            else:
+                # Move food to a random cell the snake does not occupy
+                food = free_cells.choice()
+                board[food] = FOOD
 
-        # Draw the snake
-        for segment in snake_list:
-            pygame.draw.rect(screen, WHITE, [segment[0], segment[1], CELL_SIZE, CELL_SIZE])
+        if camera.follow(snake_head):
+            redraw_view = True
 
-        # Display the score at the top left corner
-        score_text = score_font.render("Score: " + str(score), True, WHITE)
-        screen.blit(score_text, (10, 10))
+        if redraw_view:
+            # The camera moved: repaint the visible cells only.
+            repaint_cells(camera, board, screen.get_rect())
+            dirty = [screen.get_rect()]
+            shown_score = None
+            redraw_view = False
+        else:
+            # Draw only what changed: the new head, the vacated tail cell
+            # and the new food.
+            dirty = [draw_cell(camera, snake_head, WHITE)]
+            if vacated is not None and vacated != snake_head:
+                dirty.append(draw_cell(camera, vacated, BLUE))
+            if ate and not won:
+                dirty.append(draw_cell(camera, food, GREEN))
+            dirty = [rect for rect in dirty if rect is not None]
 
-        pygame.display.update()
+        # Redraw the score at the top left corner when it changes or when a
+        # cell beneath it was repainted.
+        if score != shown_score or score_rect.collidelist(dirty) != -1:
+            shown_score = score
+            score_text = score_font.render("Score: " + str(score), True, WHITE)
+            text_rect = score_text.get_rect(topleft=(10, 10))
+            area = text_rect.union(score_rect)
+            repaint_cells(camera, board, area)
+            screen.blit(score_text, text_rect)
+            dirty.append(area)
+            score_rect = text_rect
 
-        # Check if the snake has eaten the food
-        if snake_x == food_x and snake_y == food_y:
-            # Move food to a new random location
-            food_x = round(random.randrange(0, WIDTH - CELL_SIZE) / CELL_SIZE) * CELL_SIZE
-            food_y = round(random.randrange(0, HEIGHT - CELL_SIZE) / CELL_SIZE) * CELL_SIZE
-            snake_length += 1
-            score += 1  # Increase score
+        pygame.display.update(dirty)
 
         clock.tick(SNAKE_SPEED)
 
     # --- Game Over Screen ---
     over_font = pygame.font.SysFont(None, 50)
-    message = over_font.render("Game Over!", True, RED)
+    if won:
+        message = over_font.render("You Win!", True, GREEN)
+    else:
+        message = over_font.render("Game Over!", True, RED)
     screen.blit(message, (WIDTH / 3, HEIGHT / 3))
     pygame.display.update()
     pygame.time.wait(2000)
@@ -157,4 +425,19 @@ def game_loop():
     sys.exit()
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Snake Game")
+    parser.add_argument("--cols", type=int, default=COLS,
+                        help="board width in cells (up to %d)" % MAX_BOARD_SIZE)
+    parser.add_argument("--rows", type=int, default=ROWS,
+                        help="board height in cells (up to %d)" % MAX_BOARD_SIZE)
+    args = parser.parse_args()
+    try:
+        configure(args.cols, args.rows)
+    except ValueError as error:
+        parser.error(str(error))
+
+    # Set up display. Importing the module for SnakeVecEnv alone does not
+    # open a window.
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Snake Game")
     game_loop()
@@ -1,9 +1,9 @@
 import pygame
 import random
 import sys
-
-# Initialize pygame fonts
-pygame.font.init()
+import time
+from collections import deque
+import numpy as np
 
 # Global Variables for the game window and play area
 s_width = 800
@@ -11,6 +11,14 @@ s_height = 700
 play_width = 300  # 10 columns * 30 pixels per block
 play_height = 600  # 20 rows * 30 pixels per block
 block_size = 30
+grid_cols = 10
+grid_rows = 20
+
+# Timing: game logic runs at a fixed rate, rendering is capped separately.
+logic_hz = 60  # logic ticks per second
+render_fps = 60  # maximum frames drawn per second
+fall_speed = 0.27  # seconds per gravity step
+vsync = False  # ask the display for vsync on top of the frame cap
 
 # Top-left position of the play area
 top_left_x = (s_width - play_width) // 2
@@ -132,233 +140,605 @@ shape_colors = [
     (128, 0, 128)   # T - Purple
 ]
 
+# Colors indexed by a board cell's color index (0 = empty).
+cell_colors = [(0, 0, 0)] + shape_colors
+
+# Compile a shape's string templates into, for each rotation, a tuple of
+# (dx, dy) cell offsets relative to the piece position. The templates are
+# offset by 2 columns and 4 rows to align with the grid.
+def compile_shape(shape):
+    rotations = []
+    for format in shape:
+        cells = []
+        for i, line in enumerate(format):
+            for j, column in enumerate(line):
+                if column == '0':
+                    cells.append((j - 2, i - 4))
+        rotations.append(tuple(cells))
+    return tuple(rotations)
+
+# Row bitmasks of one rotation: (leftmost dx, rightmost dx, ((dy, bits), ...))
+# where bits has bit 0 at the leftmost column of the piece.
+def compile_row_masks(cells):
+    left = min(dx for dx, dy in cells)
+    right = max(dx for dx, dy in cells)
+    masks = {}
+    for dx, dy in cells:
+        masks[dy] = masks.get(dy, 0) | (1 << (dx - left))
+    return (left, right, tuple(sorted(masks.items())))
+
+# Lowest cell of one rotation in each column it covers: ((dx, dy), ...).
+def compile_bottoms(cells):
+    bottoms = {}
+    for dx, dy in cells:
+        if dy > bottoms.get(dx, -5):
+            bottoms[dx] = dy
+    return tuple(sorted(bottoms.items()))
+
+# Lookup tables indexed by [piece id][rotation], built once at import.
+# The piece id is the shape's index in `shapes`.
+shape_cells = tuple(compile_shape(shape) for shape in shapes)
+shape_row_masks = tuple(tuple(compile_row_masks(cells) for cells in rotations)
+                        for rotations in shape_cells)
+shape_bottoms = tuple(tuple(compile_bottoms(cells) for cells in rotations)
+                      for rotations in shape_cells)
+
 # Class to represent a tetromino piece.
 class Piece:
-    def __init__(self, x, y, shape):
+    def __init__(self, x, y, piece_id):
         self.x = x  # grid column position
         self.y = y  # grid row position
-        self.shape = shape
-        self.color = shape_colors[shapes.index(shape)]
+        self.id = piece_id  # index into shapes and the compiled tables
+        self.shape = shapes[piece_id]
+        self.color = shape_colors[piece_id]
+        self.color_index = piece_id + 1  # index into cell_colors
         self.rotation = 0  # current rotation state
 
-# Create the Tetris grid: a 20x10 grid initialized to black.
-def create_grid(locked_positions={}):
-    grid = [[(0, 0, 0) for _ in range(10)] for _ in range(20)]
-    
-    for i in range(len(grid)):
-        for j in range(len(grid[i])):
-            if (j, i) in locked_positions:
-                grid[i][j] = locked_positions[(j, i)]
-    return grid
+# Persistent playfield stored as a bitboard: one integer bitmask per row
+# (bit j set means column j is occupied) plus a compact color index per cell.
+# It is only rewritten when a piece locks or rows are cleared.
+class Board:
+    def __init__(self):
+        self.rows = [0] * grid_rows
+        self.colors = bytearray(grid_rows * grid_cols)  # 0 = empty
+        self.tops = [grid_rows] * grid_cols  # highest occupied row per column
+        self.fill = [0] * grid_rows  # occupied cells per row
+        self.overflow = False  # a piece locked above the top of the grid
+        self.version = 0  # bumped whenever the locked blocks change
+
+# Cell offsets of the piece's current rotation.
+def piece_cells(piece):
+    rotations = shape_cells[piece.id]
+    return rotations[piece.rotation % len(rotations)]
 
 # Convert the piece's shape format into grid positions.
 def convert_shape_format(piece):
-    positions = []
-    format = piece.shape[piece.rotation % len(piece.shape)]
-    
-    for i, line in enumerate(format):
-        row = list(line)
-        for j, column in enumerate(row):
-            if column == '0':
-                # Adjust the position to align with the grid (offset by 2 columns and 4 rows)
-                positions.append((piece.x + j - 2, piece.y + i - 4))
-    return positions
-
-# Check if the current position of the piece is valid on the grid.
-def valid_space(piece, grid):
-    accepted_positions = [[(j, i) for j in range(10) if grid[i][j] == (0, 0, 0)] for i in range(20)]
-    accepted_positions = [pos for sub in accepted_positions for pos in sub]
-    
-    formatted = convert_shape_format(piece)
-    
-    for pos in formatted:
-        if pos not in accepted_positions:
-            if pos[1] > -1:
-                return False
+    return [(piece.x + dx, piece.y + dy) for dx, dy in piece_cells(piece)]
+
+# Check if the current position of the piece is valid on the board.
+def valid_space(piece, board):
+    rotations = shape_row_masks[piece.id]
+    left, right, masks = rotations[piece.rotation % len(rotations)]
+    shift = piece.x + left
+    if shift < 0 or piece.x + right >= grid_cols:
+        return False
+    for dy, bits in masks:
+        y = piece.y + dy
+        if y >= grid_rows:
+            return False
+        # Cells above the top of the grid are always free.
+        if y > -1 and board.rows[y] & (bits << shift):
+            return False
     return True
 
-# Check if any locked positions are above the top of the grid.
-def check_lost(positions):
-    for pos in positions:
-        x, y = pos
-        if y < 1:
-            return True
-    return False
+# Write the piece into the board's row masks and color array.
+def lock_piece(piece, board):
+    for x, y in convert_shape_format(piece):
+        if y < 0:
+            board.overflow = True
+            continue
+        board.rows[y] |= 1 << x
+        board.colors[y * grid_cols + x] = piece.color_index
+        board.fill[y] += 1
+        if y < board.tops[x]:
+            board.tops[x] = y
+    board.version += 1
+
+# Recompute the per-column heights from the row masks.
+def update_tops(board):
+    for x in range(grid_cols):
+        bit = 1 << x
+        y = 0
+        while y < grid_rows and not board.rows[y] & bit:
+            y += 1
+        board.tops[x] = y
+
+# Number of rows the piece can fall before it lands, using the column heights.
+def drop_distance(piece, board):
+    rotations = shape_bottoms[piece.id]
+    # Longer than any real drop: cells sit up to 4 rows above the origin, so
+    # a piece at spawn can fall more than grid_rows rows.
+    distance = grid_rows - piece.y + 4
+    for dx, dy in rotations[piece.rotation % len(rotations)]:
+        x = piece.x + dx
+        y = piece.y + dy
+        top = board.tops[x]
+        if y >= top:
+            # The piece is tucked under an overhang; scan down this column.
+            top = y + 1
+            while top < grid_rows and not board.rows[top] >> x & 1:
+                top += 1
+        distance = min(distance, top - y - 1)
+    return distance
+
+# Check if any locked blocks reached the top of the grid.
+def check_lost(board):
+    return board.overflow or board.rows[0] != 0
+
+# Actions accepted by TetrisEngine.step().
+NOOP, LEFT, RIGHT, DOWN, ROTATE, HARD_DROP = range(6)
+
+# Headless Tetris rules: board, pieces, gravity and scoring with no pygame
+# or wall-clock dependency, so bots and regression checks can drive it.
+class TetrisEngine:
+    def __init__(self, seed=None, gravity_frames=16):
+        self.gravity_frames = gravity_frames  # logic frames per gravity step
+        self.reset(seed)
+
+    # Start a new game; the same seed always produces the same piece sequence.
+    def reset(self, seed=None):
+        self.rng = random.Random(seed)
+        self.board = Board()
+        self.current_piece = self.new_piece()
+        self.next_piece = self.new_piece()
+        self.score = 0
+        self.lines = 0
+        self.fall_frames = 0
+        self.lost = False
+
+    # Get a random new tetromino piece.
+    def new_piece(self):
+        return Piece(5, 0, self.rng.randrange(len(shapes)))
+
+    # Shift the current piece; returns False if the move was blocked.
+    def move(self, dx, dy):
+        piece = self.current_piece
+        piece.x += dx
+        piece.y += dy
+        if not valid_space(piece, self.board):
+            piece.x -= dx
+            piece.y -= dy
+            return False
+        return True
+
+    # Rotate the current piece; returns False if the rotation was blocked.
+    def rotate(self):
+        piece = self.current_piece
+        count = len(shape_cells[piece.id])
+        piece.rotation = (piece.rotation + 1) % count
+        if not valid_space(piece, self.board):
+            piece.rotation = (piece.rotation - 1) % count
+            return False
+        return True
+
+    # Lock the current piece, spawn the next one and clear full rows.
+    # Returns the number of rows cleared.
+    def lock(self):
+        lock_piece(self.current_piece, self.board)
+        self.current_piece = self.next_piece
+        self.next_piece = self.new_piece()
+        cleared = clear_rows(self.board)
+        self.lines += cleared
+        self.score += cleared * 10
+        self.lost = check_lost(self.board)
+        return cleared
+
+    # Apply one step of gravity, locking the piece if it cannot fall.
+    def fall(self):
+        piece = self.current_piece
+        piece.y += 1
+        if not valid_space(piece, self.board) and piece.y > 0:
+            piece.y -= 1
+            return self.lock()
+        return 0
+
+    # Drop the current piece straight down and lock it.
+    def hard_drop(self):
+        self.current_piece.y += drop_distance(self.current_piece, self.board)
+        return self.lock()
+
+    # Advance one logic frame: apply the action, then gravity when it is due.
+    # Returns (rows cleared, game over).
+    def step(self, action=NOOP):
+        if self.lost:
+            return 0, True
+        cleared = 0
+        if action == LEFT:
+            self.move(-1, 0)
+        elif action == RIGHT:
+            self.move(1, 0)
+        elif action == DOWN:
+            self.move(0, 1)
+        elif action == ROTATE:
+            self.rotate()
+        elif action == HARD_DROP:
+            cleared += self.hard_drop()
+            self.fall_frames = 0
+        self.fall_frames += 1
+        if not self.lost and self.fall_frames >= self.gravity_frames:
+            self.fall_frames = 0
+            cleared += self.fall()
+        return cleared, self.lost
+
+    # All (rotation, column) pairs the current piece fits in at its current row.
+    def legal_placements(self):
+        piece = self.current_piece
+        probe = Piece(piece.x, piece.y, piece.id)
+        placements = []
+        for rotation, (left, right, masks) in enumerate(shape_row_masks[piece.id]):
+            probe.rotation = rotation
+            for x in range(-left, grid_cols - right):
+                probe.x = x
+                if valid_space(probe, self.board):
+                    placements.append((rotation, x))
+        return placements
+
+    # Place the current piece at (rotation, column) with a hard drop.
+    # Returns the number of rows cleared.
+    def apply_placement(self, rotation, x):
+        piece = self.current_piece
+        old_rotation, old_x = piece.rotation, piece.x
+        piece.rotation, piece.x = rotation, x
+        if not valid_space(piece, self.board):
+            piece.rotation, piece.x = old_rotation, old_x
+            raise ValueError('illegal placement: rotation %d, column %d' % (rotation, x))
+        return self.hard_drop()
+
+    # The legal placement that evaluate_placements() scores highest.
+    def best_placement(self):
+        rotations, columns, scores = evaluate_placements(self.board, self.current_piece.id)
+        best = {(r, x): s for r, x, s in zip(rotations.tolist(), columns.tolist(), scores.tolist())}
+        return max(self.legal_placements(), key=lambda placement: best[placement])
+
+# Weights used by evaluate_placements() for aggregate height, completed
+# lines, holes and bumpiness.
+placement_weights = (-0.51, 0.76, -0.36, -0.18)
+
+# Score every (rotation, column) landing spot of a piece dropped from above
+# onto the board at once, using NumPy column-height and hole arrays.
+# Returns (rotations, columns, scores) arrays; placements that would lock
+# above the top of the grid score -inf.
+def evaluate_placements(board, piece_id, weights=placement_weights):
+    tops = np.array(board.tops)
+    rows = np.array(board.rows)
+    occupied = (rows[:, None] >> np.arange(grid_cols)) & 1
+    fill = np.array(board.fill)
+    below_top = np.arange(grid_rows)[:, None] > tops
+    holes = int(((occupied == 0) & below_top).sum())
+    w_height, w_lines, w_holes, w_bumps = weights
+
+    all_rotations, all_columns, all_scores = [], [], []
+    for rotation, cells in enumerate(shape_cells[piece_id]):
+        left, right, masks = shape_row_masks[piece_id][rotation]
+        dxs = np.arange(left, right + 1)
+        bottom = np.array([dy for dx, dy in shape_bottoms[piece_id][rotation]])
+        top = np.array([min(dy for cx, dy in cells if cx == dx) for dx in dxs])
+        xs = np.arange(-left, grid_cols - right)
+        cols = xs[:, None] + dxs  # (placements, piece width)
+        col_tops = tops[cols]
+
+        # Landing row of the piece origin and the new column tops.
+        y = (col_tops - 1 - bottom).min(axis=1)
+        new_tops = np.minimum(col_tops, y[:, None] + top)
+        heights = np.broadcast_to(grid_rows - tops, (len(xs), grid_cols)).copy()
+        np.put_along_axis(heights, cols, grid_rows - new_tops, axis=1)
+
+        # Empty cells trapped between the piece and the old column tops.
+        new_holes = holes + (col_tops - (y[:, None] + bottom) - 1).sum(axis=1)
+
+        # Rows completed by the piece's cells.
+        lines = np.zeros(len(xs), dtype=int)
+        for dy, bits in masks:
+            row = y + dy
+            inside = row >= 0
+            count = bin(bits).count('1')
+            lines += inside & (fill[np.clip(row, 0, grid_rows - 1)] + count == grid_cols)
+
+        bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+        scores = (w_height * heights.sum(axis=1) + w_lines * lines
+                  + w_holes * new_holes + w_bumps * bumpiness)
+        lost = y + min(dy for dx, dy in cells) < 1
+        scores = np.where(lost, -np.inf, scores)
+
+        all_rotations.append(np.full(len(xs), rotation))
+        all_columns.append(xs)
+        all_scores.append(scores)
+    return np.concatenate(all_rotations), np.concatenate(all_columns), np.concatenate(all_scores)
 
-# Get a random new tetromino piece.
-def get_shape():
-    return Piece(5, 0, random.choice(shapes))
+# Fonts are slow to construct, so each (size, bold) pair is built once.
+fonts = {}
+
+def get_font(size, bold=False):
+    if (size, bold) not in fonts:
+        fonts[(size, bold)] = pygame.font.SysFont('comicsans', size, bold=bold)
+    return fonts[(size, bold)]
 
 # Draw text centered on the screen.
 def draw_text_middle(surface, text, size, color):
-    font = pygame.font.SysFont('comicsans', size, bold=True)
+    font = get_font(size, bold=True)
     label = font.render(text, True, color)
     
     surface.blit(label, (top_left_x + play_width/2 - label.get_width()/2,
                          top_left_y + play_height/2 - label.get_height()/2))
 
 # Draw grid lines on the play area.
-def draw_grid(surface, grid):
+def draw_grid(surface):
     sx = top_left_x
     sy = top_left_y
-    for i in range(len(grid)):
+    for i in range(grid_rows):
         pygame.draw.line(surface, (128, 128, 128), (sx, sy + i * block_size),
                          (sx + play_width, sy + i * block_size))
-        for j in range(len(grid[i])):
+        for j in range(grid_cols):
             pygame.draw.line(surface, (128, 128, 128), (sx + j * block_size, sy),
                              (sx + j * block_size, sy + play_height))
 
 # Clear completed rows and shift the remaining blocks downward.
-def clear_rows(grid, locked):
-    cleared = 0
-    for i in range(len(grid)-1, -1, -1):
-        row = grid[i]
-        if (0, 0, 0) not in row:
-            cleared += 1
-            index = i
-            for j in range(len(row)):
-                try:
-                    del locked[(j, i)]
-                except:
-                    continue
-    if cleared > 0:
-        # Shift every row above down by the number of cleared rows.
-        for key in sorted(list(locked), key=lambda x: x[1], reverse=True):
-            x, y = key
-            if y < index:
-                newKey = (x, y + cleared)
-                locked[newKey] = locked.pop(key)
-    return cleared
-
-# Draw the "next" tetromino in a preview box.
-def draw_next_shape(piece, surface):
-    font = pygame.font.SysFont('comicsans', 30)
-    label = font.render('Next Shape', True, (255, 255, 255))
+# Full rows are found from the per-row fill counts, then the rows that stay
+# are compacted towards the bottom in a single sweep, so any pattern of
+# cleared rows costs one pass over the board.
+def clear_rows(board):
+    fill = board.fill
+    lowest = grid_rows - 1
+    while lowest >= 0 and fill[lowest] != grid_cols:
+        lowest -= 1
+    if lowest < 0:
+        return 0
     
-    sx = top_left_x + play_width + 50
-    sy = top_left_y + play_height/2 - 100
-    format = piece.shape[piece.rotation % len(piece.shape)]
+    rows = board.rows
+    colors = board.colors
+    write = lowest
+    for read in range(lowest - 1, -1, -1):
+        if fill[read] == grid_cols:
+            continue
+        rows[write] = rows[read]
+        fill[write] = fill[read]
+        colors[write * grid_cols:(write + 1) * grid_cols] = colors[read * grid_cols:(read + 1) * grid_cols]
+        write -= 1
     
-    for i, line in enumerate(format):
-        row = list(line)
-        for j, column in enumerate(row):
-            if column == '0':
-                pygame.draw.rect(surface, piece.color, 
-                                 (sx + j * block_size, sy + i * block_size, block_size, block_size), 0)
-    surface.blit(label, (sx + 10, sy - 30))
-
-# Draw the main game window including the grid, title, and score.
-def draw_window(surface, grid, score=0):
+    # Everything above the last row written is now empty.
+    cleared = write + 1
+    for y in range(cleared):
+        rows[y] = 0
+        fill[y] = 0
+    colors[:cleared * grid_cols] = bytes(cleared * grid_cols)
+    update_tops(board)
+    board.version += 1
+    return cleared
+
+# Top-left corner of the "next shape" preview box and of the score text.
+next_x = top_left_x + play_width + 50
+next_y = top_left_y + play_height/2 - 100
+score_x = top_left_x - 200 + 20
+score_y = top_left_y + 200 + 160
+
+# Tile codes used by Renderer: 0-7 are cell_colors, GHOST + piece id is the
+# ghost outline of that piece, and UNKNOWN marks a cell that must be redrawn.
+GHOST = len(cell_colors)
+UNKNOWN = 255
+
+# Render the static parts of the window once: title, empty play area,
+# grid lines, border and the preview box label.
+def build_background(size):
+    surface = pygame.Surface(size)
     surface.fill((0, 0, 0))
-    # Title
-    font = pygame.font.SysFont('comicsans', 60)
-    label = font.render('TETRIS', True, (255, 255, 255))
-    
+    label = get_font(60).render('TETRIS', True, (255, 255, 255))
     surface.blit(label, (top_left_x + play_width/2 - label.get_width()/2, 30))
-    
-    # Score display
-    font = pygame.font.SysFont('comicsans', 30)
-    label = font.render('Score: ' + str(score), True, (255, 255, 255))
-    
-    sx = top_left_x - 200
-    sy = top_left_y + 200
-    surface.blit(label, (sx + 20, sy + 160))
-    
-    # Draw the grid blocks
-    for i in range(len(grid)):
-        for j in range(len(grid[i])):
-            pygame.draw.rect(surface, grid[i][j],
-                             (top_left_x + j * block_size, top_left_y + i * block_size, block_size, block_size), 0)
-    
-    draw_grid(surface, grid)
+    label = get_font(30).render('Next Shape', True, (255, 255, 255))
+    surface.blit(label, (next_x + 10, next_y - 30))
+    draw_grid(surface)
     pygame.draw.rect(surface, (255, 0, 0), (top_left_x, top_left_y, play_width, play_height), 5)
+    return surface
+
+# Pre-render one block_size tile per tile code, including the grid lines
+# that cross its top and left edges.
+def build_tiles():
+    tiles = []
+    for color in cell_colors:
+        tile = pygame.Surface((block_size, block_size))
+        tile.fill(color)
+        tiles.append(tile)
+    for color in shape_colors:
+        tile = pygame.Surface((block_size, block_size))
+        tile.fill((0, 0, 0))
+        pygame.draw.rect(tile, color, (0, 0, block_size, block_size), 2)
+        tiles.append(tile)
+    for tile in tiles:
+        pygame.draw.line(tile, (128, 128, 128), (0, 0), (block_size, 0))
+        pygame.draw.line(tile, (128, 128, 128), (0, 0), (0, block_size))
+    return tiles
+
+# Draws the game from a cached background and tile set, repainting only the
+# board rows, score and preview box that changed since the previous frame.
+class Renderer:
+    def __init__(self, surface):
+        self.surface = surface
+        self.background = build_background(surface.get_size())
+        self.tiles = build_tiles()
+        # Red border strips that cover the outermost cells of every row.
+        self.border_strips = [pygame.Rect(top_left_x, top_left_y, 5, play_height),
+                              pygame.Rect(top_left_x + play_width - 5, top_left_y, 5, play_height),
+                              pygame.Rect(top_left_x, top_left_y, play_width, 5),
+                              pygame.Rect(top_left_x, top_left_y + play_height - 5, play_width, 5)]
+        self.invalidate()
+
+    # Force a full repaint on the next draw, e.g. after something else drew
+    # over the window.
+    def invalidate(self):
+        self.shown = bytearray([UNKNOWN]) * (grid_rows * grid_cols)
+        self.board_version = None
+        self.overlay_rows = set()
+        self.score = None
+        self.score_rect = None
+        self.next_id = None
+        self.full_redraw = True
+
+    # Draw the current state and return the list of rects to update.
+    def draw(self, board, piece, next_piece, score):
+        surface = self.surface
+        rects = []
+        if self.full_redraw:
+            surface.blit(self.background, (0, 0))
+            rects.append(surface.get_rect())
+            self.full_redraw = False
+        
+        # Falling piece and ghost outline drawn over the locked blocks.
+        overlay = {}
+        distance = drop_distance(piece, board)
+        for x, y in convert_shape_format(piece):
+            if y + distance > -1:
+                overlay[(y + distance) * grid_cols + x] = GHOST + piece.id
+        for x, y in convert_shape_format(piece):
+            if y > -1:
+                overlay[y * grid_cols + x] = piece.color_index
+        overlay_rows = {index // grid_cols for index in overlay}
+        
+        # Only rows under the old or new overlay can change unless the
+        # board itself was written.
+        if board.version != self.board_version:
+            self.board_version = board.version
+            dirty = range(grid_rows)
+        else:
+            dirty = self.overlay_rows | overlay_rows
+        self.overlay_rows = overlay_rows
+        
+        for y in dirty:
+            start = y * grid_cols
+            row = board.colors[start:start + grid_cols]
+            if y in overlay_rows:
+                for index, code in overlay.items():
+                    if start <= index < start + grid_cols:
+                        row[index - start] = code
+            if row == self.shown[start:start + grid_cols]:
+                continue
+            self.shown[start:start + grid_cols] = row
+            sy = top_left_y + y * block_size
+            surface.blits([(self.tiles[code], (top_left_x + x * block_size, sy))
+                           for x, code in enumerate(row)], False)
+            row_rect = pygame.Rect(top_left_x, sy, play_width, block_size)
+            for strip in self.border_strips:
+                clipped = strip.clip(row_rect)
+                if clipped:
+                    surface.blit(self.background, clipped, clipped)
+            rects.append(row_rect)
+        
+        if score != self.score:
+            self.score = score
+            if self.score_rect:
+                surface.blit(self.background, self.score_rect, self.score_rect)
+                rects.append(self.score_rect)
+            label = get_font(30).render('Score: ' + str(score), True, (255, 255, 255))
+            self.score_rect = surface.blit(label, (score_x, score_y))
+            rects.append(self.score_rect)
+        
+        if next_piece.id != self.next_id:
+            self.next_id = next_piece.id
+            panel = pygame.Rect(next_x, next_y, 5 * block_size, 5 * block_size)
+            surface.blit(self.background, panel, panel)
+            for dx, dy in piece_cells(next_piece):
+                # Undo the grid alignment offset to place the cell in the preview box.
+                pygame.draw.rect(surface, next_piece.color,
+                                 (next_x + (dx + 2) * block_size, next_y + (dy + 4) * block_size, block_size, block_size), 0)
+            rects.append(panel)
+        return rects
+
+# Runs game logic at a fixed rate using an accumulator and rendering at a
+# capped rate, sleeping until whichever is due next instead of spinning.
+class FixedTimestep:
+    def __init__(self, logic_hz, render_fps, max_ticks=5):
+        self.tick_time = 1.0 / logic_hz
+        self.frame_time = 1.0 / render_fps
+        self.max_ticks = max_ticks  # most ticks run at once to catch up
+        self.accumulator = 0.0
+        self.last = time.perf_counter()
+        self.next_frame = self.last
+
+    # Number of logic ticks that are due since the last call.
+    def ticks(self):
+        now = time.perf_counter()
+        self.accumulator += now - self.last
+        self.last = now
+        count = int(self.accumulator / self.tick_time)
+        self.accumulator -= count * self.tick_time
+        # After a long stall (e.g. the window was dragged) drop the backlog
+        # rather than fast-forwarding the game.
+        return min(count, self.max_ticks)
+
+    # Whether a frame should be drawn now.
+    def render_due(self):
+        now = time.perf_counter()
+        if now < self.next_frame:
+            return False
+        self.next_frame += self.frame_time
+        if self.next_frame < now:
+            self.next_frame = now + self.frame_time
+        return True
+
+    # Sleep until the next logic tick or frame, whichever comes first.
+    def sleep(self):
+        next_tick = self.last + self.tick_time - self.accumulator
+        delay = min(next_tick, self.next_frame) - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+# Keys mapped to TetrisEngine actions.
+key_actions = {
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_DOWN: DOWN,
+    pygame.K_UP: ROTATE,
+    pygame.K_SPACE: HARD_DROP,
+}
 
 # Main game loop.
 def main():
-    locked_positions = {}
-    grid = create_grid(locked_positions)
-    
-    current_piece = get_shape()
-    next_piece = get_shape()
-    clock = pygame.time.Clock()
-    fall_time = 0
-    fall_speed = 0.27
-    score = 0
+    engine = TetrisEngine(gravity_frames=round(fall_speed * logic_hz))
+    renderer = Renderer(screen)
+    scheduler = FixedTimestep(logic_hz, render_fps)
+    actions = deque()
     
     run = True
     while run:
-        grid = create_grid(locked_positions)
-        fall_time += clock.get_rawtime()
-        clock.tick()
-        
-        # Handle automatic piece falling.
-        if fall_time/1000 >= fall_speed:
-            fall_time = 0
-            current_piece.y += 1
-            if not valid_space(current_piece, grid) and current_piece.y > 0:
-                current_piece.y -= 1
-                # Lock the piece and spawn a new one.
-                for pos in convert_shape_format(current_piece):
-                    locked_positions[(pos[0], pos[1])] = current_piece.color
-                current_piece = next_piece
-                next_piece = get_shape()
-                cleared = clear_rows(grid, locked_positions)
-                score += cleared * 10
-        
-        # Process user inputs.
+        # Process user inputs; they are applied by the next logic ticks.
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
                 pygame.display.quit()
                 sys.exit()
             
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    current_piece.x -= 1
-                    if not valid_space(current_piece, grid):
-                        current_piece.x += 1
-                elif event.key == pygame.K_RIGHT:
-                    current_piece.x += 1
-                    if not valid_space(current_piece, grid):
-                        current_piece.x -= 1
-                elif event.key == pygame.K_DOWN:
-                    current_piece.y += 1
-                    if not valid_space(current_piece, grid):
-                        current_piece.y -= 1
-                elif event.key == pygame.K_UP:
-                    current_piece.rotation = (current_piece.rotation + 1) % len(current_piece.shape)
-                    if not valid_space(current_piece, grid):
-                        current_piece.rotation = (current_piece.rotation - 1) % len(current_piece.shape)
-                elif event.key == pygame.K_SPACE:  # Hard drop
-                    while valid_space(current_piece, grid):
-                        current_piece.y += 1
-                    current_piece.y -= 1
+            if event.type == pygame.KEYDOWN and event.key in key_actions:
+                actions.append(key_actions[event.key])
         
-                    for pos in convert_shape_format(current_piece):
-                        locked_positions[(pos[0], pos[1])] = current_piece.color
-                    current_piece = next_piece
-                    next_piece = get_shape()
-                    cleared = clear_rows(grid, locked_positions)
-                    score += cleared * 10
+        # Advance the game by whole logic ticks, one queued action per tick.
+        for _ in range(scheduler.ticks()):
+            engine.step(actions.popleft() if actions else NOOP)
+            if engine.lost:
+                break
         
-        # Draw the current piece on the grid.
-        for pos in convert_shape_format(current_piece):
-            x, y = pos
-            if y > -1:
-                grid[y][x] = current_piece.color
+        if scheduler.render_due():
+            pygame.display.update(renderer.draw(engine.board, engine.current_piece,
+                                                engine.next_piece, engine.score))
         
-        draw_window(screen, grid, score)
-        draw_next_shape(next_piece, screen)
-        pygame.display.update()
-        
-        if check_lost(locked_positions):
+        if engine.lost:
             draw_text_middle(screen, "YOU LOST", 80, (255, 255, 255))
             pygame.display.update()
             pygame.time.delay(2000)
             run = False
+        else:
+            scheduler.sleep()
 
 # Main menu screen before the game starts.
 def main_menu():
+    clock = pygame.time.Clock()
     run = True
     while run:
         screen.fill((0, 0, 0))
@@ -371,11 +751,16 @@ def main_menu():
                 sys.exit()
             if event.type == pygame.KEYDOWN:
                 main()
+        clock.tick(render_fps)
     pygame.quit()
 
-# Set up the game window.
-screen = pygame.display.set_mode((s_width, s_height))
-pygame.display.set_caption('Tetris')
-
 if __name__ == '__main__':
+    # Set up fonts and the game window. Importing the module for
+    # TetrisEngine alone initializes neither.
+    pygame.font.init()
+    if vsync:
+        screen = pygame.display.set_mode((s_width, s_height), pygame.SCALED, vsync=1)
+    else:
+        screen = pygame.display.set_mode((s_width, s_height))
+    pygame.display.set_caption('Tetris')
     main_menu()